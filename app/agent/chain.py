@@ -0,0 +1,116 @@
+# app/agent/chain.py
+import asyncio
+import logging
+import os
+from typing import Dict, Optional
+
+from app.agent.extractor import extract_section, pre_extract
+from app.agent.model import aparse_cv_with_openai, aparse_section_with_openai
+from app.agent.sections import split_sections, diff_sections, merge_sections
+from app.core.schemas.profile import ProfileCreate
+
+logger = logging.getLogger(__name__)
+
+# Modo de procesamiento: "sections" (llamadas paralelas por sección) o "single"
+CV_PARSE_MODE = os.getenv("CV_PARSE_MODE", "sections")
+
+
+async def _parse_sections(sections: Dict[str, str]) -> dict:
+    """
+    Resuelve cada sección con la extracción determinista cuando basta y lanza
+    en paralelo una llamada al modelo por cada sección restante.
+    """
+    parsed = {}
+    for name, text in sections.items():
+        section_data = extract_section(name, text)
+        if section_data is not None:
+            parsed[name] = section_data
+
+    pending = [name for name in sections if name not in parsed]
+    if parsed:
+        logger.info(f"Secciones resueltas sin el modelo: {list(parsed)}")
+    results = await asyncio.gather(
+        *(aparse_section_with_openai(name, sections[name]) for name in pending)
+    )
+    parsed.update(zip(pending, results))
+    return parsed
+
+
+async def _parse_full_cv(cv_text: str) -> ProfileCreate:
+    """
+    Procesa el CV completo en una llamada; los campos ya resueltos por la
+    extracción determinista se omiten del prompt y se completan después.
+    El contacto solo se toma si el correo aparece en el preámbulo del CV.
+    Los idiomas solo se omiten si superan la misma cobertura que exige
+    `extract_section`; si no, los resuelve el modelo y los detectados por
+    patrones quedan como respaldo.
+    """
+    pre = pre_extract(cv_text)
+    languages = extract_section("languages", split_sections(cv_text).get("languages", cv_text))
+    known_fields = []
+    if pre.contact_info:
+        known_fields.append("contact_info")
+    if languages is not None:
+        known_fields.append("languages")
+
+    profile = await aparse_cv_with_openai(cv_text, known_fields)
+    updates = {}
+    if pre.contact_info:
+        updates["contact_info"] = pre.contact_info
+    if languages is not None:
+        updates["languages"] = languages.languages
+    elif pre.languages and not profile.languages:
+        updates["languages"] = pre.languages
+    if pre.skills and not profile.skills:
+        updates["skills"] = pre.skills
+    return profile.model_copy(update=updates)
+
+
+async def parse_cv_by_sections(cv_text: str) -> ProfileCreate:
+    """
+    Procesa el CV con una llamada por sección en paralelo, de modo que la
+    latencia total sea la de la sección más lenta. Si el seccionado falla,
+    se recurre a una única llamada con el CV completo.
+    """
+    sections = split_sections(cv_text)
+    if CV_PARSE_MODE != "sections" or "contact" not in sections:
+        return await _parse_full_cv(cv_text)
+
+    try:
+        return merge_sections(None, await _parse_sections(sections))
+    except Exception as e:
+        logger.warning(f"Fallo en la extracción por secciones, se procesa el CV completo: {e}")
+        return await _parse_full_cv(cv_text)
+
+
+async def parse_cv_incremental(cv_text: str,
+                               previous_text: Optional[str] = None,
+                               previous_data: Optional[dict] = None
+                               ) -> ProfileCreate:
+    """
+    Procesa el CV reutilizando el resultado de la carga anterior.
+    Solo las secciones modificadas se envían de nuevo al modelo; si no hay
+    carga previa, el seccionado no es comparable o el reprocesado falla, se
+    procesa el CV completo.
+    """
+    if not previous_text or not previous_data:
+        return await parse_cv_by_sections(cv_text)
+
+    old_sections = split_sections(previous_text)
+    new_sections = split_sections(cv_text)
+    if not new_sections or old_sections.keys() != new_sections.keys():
+        return await parse_cv_by_sections(cv_text)
+
+    base = ProfileCreate.model_validate(previous_data)
+    changed = diff_sections(old_sections, new_sections)
+    if not changed:
+        logger.info("CV sin cambios respecto a la carga anterior")
+        return base
+
+    logger.info(f"Reprocesando secciones modificadas: {changed}")
+    try:
+        parsed = await _parse_sections({section: new_sections[section] for section in changed})
+        return merge_sections(base, parsed)
+    except Exception as e:
+        logger.warning(f"Fallo en el reprocesado incremental, se procesa el CV de nuevo: {e}")
+        return await parse_cv_by_sections(cv_text)
@@ -0,0 +1,331 @@
+# app/agent/extractor.py
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.agent.sections import contact_preamble
+from app.core.schemas.profile import (
+    ContactInfo,
+    ContactSection,
+    Language,
+    LanguagesSection,
+    SkillsSection,
+)
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<![\w+])\+?\d[\d\s().-]{6,}\d(?!\w)")
+
+# Dígitos de un teléfono: con prefijo internacional "+" o, sin él, al menos 9 (móvil o fijo con código)
+MIN_PHONE_DIGITS = 9
+MIN_INTERNATIONAL_PHONE_DIGITS = 8
+MAX_PHONE_DIGITS = 15
+URL_RE = re.compile(r"(?:https?://|www\.)\S+|\b[\w-]+(?:\.[\w-]+)*\.(?:com|io|dev|pe|es|org|net)(?:/\S*)?\b")
+
+_MONTH = (
+    r"(?:ene(?:ro)?|feb(?:rero)?|mar(?:zo)?|abr(?:il)?|may(?:o)?|jun(?:io)?|jul(?:io)?|ago(?:sto)?|"
+    r"sep(?:tiembre)?|set(?:iembre)?|oct(?:ubre)?|nov(?:iembre)?|dic(?:iembre)?|jan(?:uary)?|"
+    r"apr(?:il)?|aug(?:ust)?|dec(?:ember)?|june?|july?|march|february|october|november|september)\.?"
+)
+_DATE = rf"(?:{_MONTH}\s+(?:de\s+)?\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|a|to|hasta)\s*(?P<end>{_DATE}|actualidad|presente|actual|present|current|now)",
+    re.IGNORECASE,
+)
+
+# Palabras de rótulo que no aportan información por sí mismas
+LABEL_WORDS = {
+    "email", "e-mail", "correo", "phone", "teléfono", "telefono", "celular", "móvil", "movil",
+    "nivel", "level", "y", "and", "de", "en",
+}
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Golang", "Rust", "C#", "C++", "PHP", "Ruby",
+    "Kotlin", "Swift", "Scala", "SQL", "NoSQL", "HTML", "CSS", "React", "Angular", "Vue", "Next.js",
+    "Node.js", "Express", "Django", "Flask", "FastAPI", "Spring", "Spring Boot", ".NET", "Laravel",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch", "Kafka", "RabbitMQ", "GraphQL",
+    "REST", "gRPC", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins", "GitHub Actions",
+    "GitLab CI", "CI/CD", "Git", "Linux", "AWS", "Azure", "GCP", "Google Cloud", "Microservicios",
+    "Microservices", "DevOps", "Machine Learning", "Deep Learning", "NLP", "LangChain", "LangGraph",
+    "RAG", "OpenAI", "TensorFlow", "PyTorch", "scikit-learn", "Pandas", "NumPy", "Spark", "Airflow",
+    "Power BI", "Tableau", "Excel", "Scrum", "Kanban", "Jira", "Figma",
+]
+
+# Habilidades que también son palabras comunes ("go", "rest", "excel"...):
+# solo se aceptan escritas exactamente así
+CASE_SENSITIVE_SKILLS = {"Go", "REST", "Express", "Spring", "Swift", "Excel", "Rust", "Ruby", "Spark", "Git"}
+
+LANGUAGES = {
+    "español": "Español", "espanol": "Español", "spanish": "Español",
+    "inglés": "Inglés", "ingles": "Inglés", "english": "Inglés",
+    "portugués": "Portugués", "portugues": "Portugués", "portuguese": "Portugués",
+    "francés": "Francés", "frances": "Francés", "french": "Francés",
+    "alemán": "Alemán", "aleman": "Alemán", "german": "Alemán",
+    "italiano": "Italiano", "italian": "Italiano",
+    "chino": "Chino", "mandarín": "Chino", "chinese": "Chino",
+    "japonés": "Japonés", "japones": "Japonés", "japanese": "Japonés",
+    "quechua": "Quechua",
+}
+
+PROFICIENCIES = {
+    "nativo": "Nativo", "native": "Nativo", "lengua materna": "Nativo",
+    "bilingüe": "Bilingüe", "bilingue": "Bilingüe", "fluido": "Avanzado", "fluent": "Avanzado",
+    "avanzado": "Avanzado", "advanced": "Avanzado",
+    "intermedio": "Intermedio", "intermediate": "Intermedio",
+    "básico": "Básico", "basico": "Básico", "basic": "Básico",
+    "a1": "A1", "a2": "A2", "b1": "B1", "b2": "B2", "c1": "C1", "c2": "C2",
+}
+UNKNOWN_PROFICIENCY = "No especificado"
+
+# Fracción mínima del texto de una sección explicada por la extracción determinista
+# para prescindir del modelo en esa sección
+MIN_COVERAGE = 0.8
+
+# En la sección de contacto cualquier texto no explicado (ubicación, titular,
+# resumen) requiere el modelo
+MIN_CONTACT_COVERAGE = 1.0
+
+
+class AhoCorasick:
+    """
+    Buscador multi-patrón (Aho-Corasick) sin distinción de mayúsculas.
+    Encuentra todas las apariciones de un diccionario en una sola pasada
+    y solo acepta coincidencias de palabras completas.
+    """
+
+    def __init__(self, patterns: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+        for pattern, value in patterns.items():
+            self._add(pattern.lower(), value)
+        self._build()
+
+    def _add(self, pattern: str, value: str):
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append((len(pattern), value))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self._goto[state].items():
+                queue.append(target)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[target] = candidate if candidate != target else 0
+                self._output[target] = self._output[target] + self._output[self._fail[target]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """Retorna (inicio, fin, valor) de las coincidencias más largas sin solapamiento."""
+        lowered = text.lower()
+        matches = []
+        state = 0
+        for index, char in enumerate(lowered):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                start, end = index - length + 1, index + 1
+                if _is_word_boundary(lowered, start, end):
+                    matches.append((start, end, value))
+
+        # Prefiere las coincidencias más largas ("Spring Boot" frente a "Spring")
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        selected = []
+        last_end = -1
+        for match in matches:
+            if match[0] >= last_end:
+                selected.append(match)
+                last_end = match[1]
+        return selected
+
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not (before.isalnum() or after.isalnum())
+
+
+skills_matcher = AhoCorasick({skill: skill for skill in SKILLS})
+languages_matcher = AhoCorasick(LANGUAGES)
+proficiency_matcher = AhoCorasick(PROFICIENCIES)
+
+
+@dataclass
+class PreExtraction:
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    skills: List[str] = field(default_factory=list)
+    languages: List[Language] = field(default_factory=list)
+
+    @property
+    def contact_info(self) -> Optional[ContactInfo]:
+        if not self.email:
+            return None
+        return ContactInfo(email=self.email, phone=self.phone)
+
+
+def _unique(values: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(values))
+
+
+def _guess_name(text: str) -> Tuple[Optional[str], Optional[str], Tuple[int, int]]:
+    """
+    Toma como nombre la primera línea no vacía si tiene de 2 a 4 palabras
+    alfabéticas. Retorna nombre, apellidos y la posición de la línea.
+    """
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        words = line.split()
+        if words:
+            if 2 <= len(words) <= 4 and all(word.replace("-", "").isalpha() for word in words):
+                words = [word.capitalize() if word.isupper() else word for word in words]
+                return words[0], " ".join(words[1:]), (offset, offset + len(line))
+            break
+        offset += len(line)
+    return None, None, (0, 0)
+
+
+def find_phone(text: str) -> Optional[re.Match]:
+    """
+    Primer teléfono plausible del texto: descarta rangos de fechas
+    ("2019 - 2021") y secuencias con pocos o demasiados dígitos.
+    """
+    dates = [m.span() for m in DATE_RANGE_RE.finditer(text)]
+    for match in PHONE_RE.finditer(text):
+        digits = sum(char.isdigit() for char in match.group(0))
+        minimum = MIN_INTERNATIONAL_PHONE_DIGITS if match.group(0).startswith("+") else MIN_PHONE_DIGITS
+        if not minimum <= digits <= MAX_PHONE_DIGITS:
+            continue
+        if any(start < match.end() and match.start() < end for start, end in dates):
+            continue
+        return match
+    return None
+
+
+def find_skills(text: str) -> List[Tuple[int, int, str]]:
+    """Coincidencias de habilidades; las ambiguas deben aparecer con su grafía exacta."""
+    return [
+        (start, end, value) for start, end, value in skills_matcher.find(text)
+        if value not in CASE_SENSITIVE_SKILLS or text[start:end] == value
+    ]
+
+
+def _extract_languages(text: str) -> Tuple[List[Language], List[Tuple[int, int]]]:
+    """
+    Empareja cada idioma con el nivel más cercano que lo sigue en la misma
+    línea, antes del siguiente idioma ("Inglés avanzado, Español nativo").
+    Si la línea tiene un único idioma, también vale un nivel que lo preceda.
+    """
+    languages = {}
+    spans = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        found = languages_matcher.find(line)
+        levels = proficiency_matcher.find(line)
+        for start, end, _ in found + levels:
+            spans.append((offset + start, offset + end))
+        for index, (_, end, language) in enumerate(found):
+            limit = found[index + 1][0] if index + 1 < len(found) else len(line)
+            following = [value for start, _, value in levels if end <= start < limit]
+            if following:
+                proficiency = following[0]
+            elif len(found) == 1 and levels:
+                proficiency = levels[0][2]
+            else:
+                proficiency = UNKNOWN_PROFICIENCY
+            languages.setdefault(language, Language(language=language, proficiency=proficiency))
+        offset += len(line)
+    return list(languages.values()), spans
+
+
+def pre_extract(cv_text: str) -> PreExtraction:
+    """
+    Extrae de forma determinista los campos con patrones regulares. El nombre,
+    el correo y el teléfono solo se buscan en el preámbulo de contacto, para no
+    tomar los de una referencia o un rango de fechas del resto del CV.
+    """
+    preamble = contact_preamble(cv_text)
+    first_name, last_name, _ = _guess_name(preamble)
+    email = EMAIL_RE.search(preamble)
+    phone = find_phone(preamble)
+    languages, _ = _extract_languages(cv_text)
+    return PreExtraction(
+        first_name=first_name,
+        last_name=last_name,
+        email=email.group(0) if email else None,
+        phone=" ".join(phone.group(0).split()) if phone else None,
+        skills=_unique(value for _, _, value in find_skills(cv_text)),
+        languages=languages,
+    )
+
+
+def _coverage(text: str, spans: Iterable[Tuple[int, int]]) -> float:
+    """Fracción de caracteres alfanuméricos del texto cubiertos por las coincidencias."""
+    covered = bytearray(len(text))
+    for start, end in spans:
+        covered[start:end] = b"\x01" * (end - start)
+    for match in re.finditer(r"\w+", text):
+        if match.group(0).lower() in LABEL_WORDS:
+            covered[match.start():match.end()] = b"\x01" * (match.end() - match.start())
+
+    total = hits = 0
+    for index, char in enumerate(text):
+        if char.isalnum():
+            total += 1
+            hits += covered[index]
+    return hits / total if total else 1.0
+
+
+def extract_section(section: str, section_text: str) -> Optional[BaseModel]:
+    """
+    Resuelve una sección del CV sin el modelo cuando la extracción determinista
+    explica casi todo su contenido. Retorna None si hace falta el modelo.
+    """
+    if section == "skills":
+        matches = find_skills(section_text)
+        if matches and _coverage(section_text, [(s, e) for s, e, _ in matches]) >= MIN_COVERAGE:
+            return SkillsSection(skills=_unique(value for _, _, value in matches))
+
+    elif section == "languages":
+        languages, spans = _extract_languages(section_text)
+        if languages and _coverage(section_text, spans) >= MIN_COVERAGE:
+            return LanguagesSection(languages=languages)
+
+    elif section == "contact":
+        first_name, last_name, name_span = _guess_name(section_text)
+        email = EMAIL_RE.search(section_text)
+        if not (first_name and email):
+            return None
+        phone = find_phone(section_text)
+        spans = [name_span, email.span()] + ([phone.span()] if phone else [])
+        spans += [m.span() for m in URL_RE.finditer(section_text)]
+        if _coverage(section_text, spans) >= MIN_CONTACT_COVERAGE:
+            return ContactSection(
+                first_name=first_name,
+                last_name=last_name,
+                headline=None,
+                about=None,
+                location=None,
+                contact_info=ContactInfo(
+                    email=email.group(0),
+                    phone=" ".join(phone.group(0).split()) if phone else None
+                ),
+            )
+
+    # La experiencia y la educación siempre requieren el modelo
+    return None
@@ -1,8 +1,208 @@
-from langchain_community.document_loaders import PyPDFLoader
+import mmap
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from pypdf import PdfReader
+
+# Límites por defecto para acotar la memoria ante archivos patológicos
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 50))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", 200_000))
+
+# A partir de este número de páginas se extrae en paralelo
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 20))
+PDF_PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", os.cpu_count() or 2))
+
+# Motor de extracción: "pypdf", "parallel" o "pypdfloader"
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pypdf")
+
+# Pool de procesos compartido por todas las extracciones en paralelo
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+@dataclass
+class ExtractionResult:
+    text: str
+    page_count: int
+    truncated: bool = False
+
+
+@contextmanager
+def _mapped_reader(file_path: str) -> Iterator[PdfReader]:
+    """Abre el PDF sobre un archivo mapeado en memoria, sin copiarlo al heap."""
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield PdfReader(mapped)
+
+
+def _extract_page_range(file_path: str, start: int, stop: int, max_chars: int) -> List[str]:
+    """
+    Extrae el texto de un rango de páginas (se ejecuta en un proceso aparte).
+    Deja de extraer en cuanto el rango alcanza `max_chars`.
+    """
+    pages = []
+    chars = 0
+    with _mapped_reader(file_path) as reader:
+        for i in range(start, stop):
+            if chars >= max_chars:
+                break
+            text = reader.pages[i].extract_text() or ""
+            pages.append(text)
+            chars += len(text) + 1
+    return pages
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Crea bajo demanda el pool de procesos compartido. Se usa `spawn` porque se
+    invoca desde los hilos del servidor y un fork copiaría el estado de esos hilos.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_PARALLEL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pdf_pool():
+    """Detiene el pool de extracción en paralelo, si llegó a crearse."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+class PdfTextExtractor:
+    """
+    Interfaz de los motores de extracción de texto de PDF.
+    Las implementaciones generan el texto página a página en `iter_pages`.
+    """
+
+    def __init__(self, max_pages: Optional[int] = None, max_chars: Optional[int] = None):
+        self.max_pages = max_pages if max_pages is not None else PDF_MAX_PAGES
+        self.max_chars = max_chars if max_chars is not None else PDF_MAX_CHARS
+        # Páginas del documento completo; lo fija `iter_pages` al abrirlo
+        self.total_pages: Optional[int] = None
+
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        raise NotImplementedError
+
+    def extract(self, file_path: str) -> ExtractionResult:
+        """Une el texto de las páginas respetando los límites de páginas y caracteres."""
+        parts = []
+        chars = 0
+        truncated = False
+        for page_text in self.iter_pages(file_path):
+            # El separador entre páginas también cuenta para el límite
+            separator = 1 if parts else 0
+            remaining = max(0, self.max_chars - chars - separator)
+            if len(page_text) > remaining:
+                if remaining:
+                    parts.append(page_text[:remaining])
+                truncated = True
+                break
+            parts.append(page_text)
+            chars += separator + len(page_text)
+        if self.total_pages is not None and self.total_pages > self.max_pages:
+            truncated = True
+        return ExtractionResult(text="\n".join(parts), page_count=len(parts), truncated=truncated)
+
+
+class PyPdfExtractor(PdfTextExtractor):
+    """Extracción directa con pypdf, página a página y sobre un archivo mapeado."""
+
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        with _mapped_reader(file_path) as reader:
+            self.total_pages = len(reader.pages)
+            for page in reader.pages[:self.max_pages]:
+                yield page.extract_text() or ""
+
+
+class ParallelPyPdfExtractor(PdfTextExtractor):
+    """
+    Extracción en paralelo por rangos de páginas para PDFs grandes, sobre el
+    pool compartido del módulo. Por debajo de `min_pages` se comporta como
+    PyPdfExtractor.
+
+    Cada rango se extrae en un proceso que vuelve a abrir el PDF, por lo que se
+    usa un rango por worker. Cada worker corta al llegar a `max_chars`, de modo
+    que la memoria queda acotada a `workers * max_chars` aunque el texto final
+    se trunque después.
+    """
+
+    def __init__(self, max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                 workers: int = PDF_PARALLEL_WORKERS, min_pages: int = PDF_PARALLEL_MIN_PAGES):
+        super().__init__(max_pages, max_chars)
+        self.workers = workers
+        self.min_pages = min_pages
+
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        with _mapped_reader(file_path) as reader:
+            self.total_pages = len(reader.pages)
+            total = min(self.total_pages, self.max_pages)
+            if total < self.min_pages or self.workers < 2:
+                for page in reader.pages[:total]:
+                    yield page.extract_text() or ""
+                return
+
+        chunk = -(-total // self.workers)
+        executor = _get_pool()
+        futures = [
+            executor.submit(_extract_page_range, file_path, start, min(start + chunk, total), self.max_chars)
+            for start in range(0, total, chunk)
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            # Si se alcanzó el límite antes de consumir todos los rangos, se descartan los pendientes
+            for future in futures:
+                future.cancel()
+
+
+class PyPDFLoaderExtractor(PdfTextExtractor):
+    """Motor original basado en PyPDFLoader de LangChain."""
+
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        pages = extract_text_with_pypdfloader(file_path)
+        self.total_pages = len(pages)
+        for page in pages[:self.max_pages]:
+            yield page.page_content
+
+
+EXTRACTORS = {
+    "pypdf": PyPdfExtractor,
+    "parallel": ParallelPyPdfExtractor,
+    "pypdfloader": PyPDFLoaderExtractor,
+}
+
+
+def get_extractor(name: str = PDF_EXTRACTOR, **kwargs) -> PdfTextExtractor:
+    """Factory para obtener el motor de extracción configurado."""
+    try:
+        return EXTRACTORS[name](**kwargs)
+    except KeyError:
+        raise ValueError(f"Motor de extracción desconocido: {name}") from None
+
+
+def extract_cv_text(file_path: str) -> ExtractionResult:
+    """Extrae el texto del CV con el motor configurado."""
+    return get_extractor().extract(file_path)
 
 
 # Función para cargar el PDF
 def extract_text_with_pypdfloader(file_path: str):
+    from langchain_community.document_loaders import PyPDFLoader
+
     loader = PyPDFLoader(file_path)
     pages = loader.load()  # Carga todas las páginas como objetos Document
     return pages
@@ -1,6 +1,13 @@
+import os
+import time
+from typing import AsyncIterator, List, Optional, Union
+
+from langchain_core.utils.json import parse_json_markdown
 from langchain_openai import ChatOpenAI
 
-from app.agent.prompt import format_prompt, parser
+from app.agent.prompt import format_prompt, parser, format_section_prompt, section_parsers
+from app.core.schemas.profile import ProfileCreate
+from app.core.tracing.tracer import span, traced
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,4 +18,49 @@ llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
 def parse_cv_with_openai(cv_text: str) -> dict:
     formatted_prompt = format_prompt(cv_text)
     response = llm.invoke(formatted_prompt)
-    return parser.parse(response.content)
\ No newline at end of file
+    return parser.parse(response.content)
+
+
+# Versiones asíncronas, para lanzar varias llamadas en paralelo
+@traced("llm.parse_cv")
+async def aparse_cv_with_openai(cv_text: str, known_fields: Optional[List[str]] = None):
+    formatted_prompt = format_prompt(cv_text, known_fields)
+    response = await llm.ainvoke(formatted_prompt)
+    return parser.parse(response.content)
+
+
+async def aparse_section_with_openai(section: str, section_text: str):
+    formatted_prompt = format_section_prompt(section, section_text)
+    with span("llm.parse_section", section=section):
+        response = await llm.ainvoke(formatted_prompt)
+    return section_parsers[section].parse(response.content)
+
+
+# Intervalo mínimo entre parciales del streaming, en segundos
+STREAM_PARTIAL_INTERVAL = float(os.getenv("STREAM_PARTIAL_INTERVAL", 0.5))
+
+
+# Procesa el CV en streaming: emite los campos de primer nivel que cambiaron
+# desde el último parcial y, al terminar, el ProfileCreate validado. El buffer
+# se interpreta como mucho una vez por intervalo, no en cada token
+async def astream_cv_with_openai(cv_text: str) -> AsyncIterator[Union[dict, ProfileCreate]]:
+    formatted_prompt = format_prompt(cv_text)
+    chunks = []
+    emitted = {}
+    next_parse = time.monotonic() + STREAM_PARTIAL_INTERVAL
+    async for chunk in llm.astream(formatted_prompt):
+        chunks.append(chunk.content)
+        if time.monotonic() < next_parse:
+            continue
+        next_parse = time.monotonic() + STREAM_PARTIAL_INTERVAL
+        try:
+            partial = parse_json_markdown("".join(chunks))
+        except ValueError:
+            continue
+        if not isinstance(partial, dict):
+            continue
+        changed = {key: value for key, value in partial.items() if emitted.get(key) != value}
+        if changed:
+            emitted.update(changed)
+            yield changed
+    yield parser.parse("".join(chunks))
@@ -1,7 +1,16 @@
+from typing import List, Optional
+
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 
-from app.core.schemas.profile import ProfileCreate
+from app.core.schemas.profile import (
+    ProfileCreate,
+    ContactSection,
+    ExperienceSection,
+    EducationSection,
+    SkillsSection,
+    LanguagesSection,
+)
 
 # Define el parser para estructurar la salida
 parser = PydanticOutputParser(pydantic_object=ProfileCreate)
@@ -17,16 +26,61 @@ prompt = ChatPromptTemplate.from_template(
     - Idiomas
 
     La salida debe estar en formato JSON según este esquema: {format_instructions}
-
+    {known_data}
     CV:
     {cv_text}
     """
 )
 
+# Bloque con los campos ya resueltos por la extracción determinista
+known_data_template = """
+    Los siguientes campos ya fueron extraídos; no los repitas y devuelve null
+    o una lista vacía en su lugar: {fields}
+"""
+
+# Parsers y descripciones para la extracción por secciones
+section_parsers = {
+    "contact": PydanticOutputParser(pydantic_object=ContactSection),
+    "experience": PydanticOutputParser(pydantic_object=ExperienceSection),
+    "education": PydanticOutputParser(pydantic_object=EducationSection),
+    "skills": PydanticOutputParser(pydantic_object=SkillsSection),
+    "languages": PydanticOutputParser(pydantic_object=LanguagesSection),
+}
+
+section_descriptions = {
+    "contact": "Nombre completo, titular, resumen, ubicación e información de contacto",
+    "experience": "Experiencia laboral (empresa, puesto, ubicación, fechas, descripción)",
+    "education": "Educación (institución, título, especialidad, fechas, descripción)",
+    "skills": "Habilidades",
+    "languages": "Idiomas y nivel de dominio",
+}
+
+section_prompt = ChatPromptTemplate.from_template(
+    """
+    Por favor, extrae la siguiente información de esta sección de un CV:
+    - {section_description}
+
+    La salida debe estar en formato JSON según este esquema: {format_instructions}
+
+    Sección del CV:
+    {section_text}
+    """
+)
+
 
-# Genera el prompt completo
-def format_prompt(cv_text: str):
+# Genera el prompt completo; `known_fields` son los campos que el modelo puede omitir
+def format_prompt(cv_text: str, known_fields: Optional[List[str]] = None):
     return prompt.format(
         format_instructions=parser.get_format_instructions(),
+        known_data=known_data_template.format(fields=", ".join(known_fields)) if known_fields else "",
         cv_text=cv_text
     )
+
+
+# Genera el prompt para una sección concreta del CV
+def format_section_prompt(section: str, section_text: str):
+    return section_prompt.format(
+        section_description=section_descriptions[section],
+        format_instructions=section_parsers[section].get_format_instructions(),
+        section_text=section_text
+    )
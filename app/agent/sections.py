@@ -0,0 +1,137 @@
+# app/agent/sections.py
+import hashlib
+import re
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.core.schemas.profile import ProfileCreate
+
+# Secciones reconocidas del CV, en el orden en que se suelen presentar
+SECTION_NAMES = ("contact", "experience", "education", "skills", "languages")
+
+# Encabezados típicos (español e inglés) que abren cada sección
+SECTION_HEADINGS = {
+    "experience": re.compile(
+        r"^(experiencia( laboral| profesional)?|historial laboral|"
+        r"(work |professional )?experience|employment( history)?)$"
+    ),
+    "education": re.compile(
+        r"^(educaci[oó]n|formaci[oó]n( acad[eé]mica)?|estudios|education|academic background)$"
+    ),
+    "skills": re.compile(
+        r"^(habilidades( t[eé]cnicas)?|competencias|conocimientos|aptitudes|"
+        r"(technical )?skills|tecnolog[ií]as)$"
+    ),
+    "languages": re.compile(r"^(idiomas|lenguajes|languages)$"),
+}
+
+# Un encabezado es una línea corta; evita confundir frases con títulos
+MAX_HEADING_LENGTH = 40
+
+# Mínimo de encabezados reconocidos para considerar válido el seccionado
+MIN_HEADINGS = 2
+
+# Tamaño máximo del texto previo al primer encabezado (nombre, titular, contacto y
+# resumen). Uno mayor indica que el PDF agrupó los encabezados fuera de su sitio
+MAX_CONTACT_CHARS = 1500
+
+
+def _normalize_heading(line: str) -> str:
+    return re.sub(r"[\s:•\-–|]+$", "", line.strip().lower()).strip()
+
+
+def _match_heading(line: str) -> Optional[str]:
+    candidate = _normalize_heading(line)
+    if not candidate or len(candidate) > MAX_HEADING_LENGTH:
+        return None
+    for section, pattern in SECTION_HEADINGS.items():
+        if pattern.match(candidate):
+            return section
+    return None
+
+
+def contact_preamble(cv_text: str) -> str:
+    """Texto previo al primer encabezado reconocido, acotado a MAX_CONTACT_CHARS."""
+    lines = []
+    for line in cv_text.splitlines():
+        if _match_heading(line):
+            break
+        lines.append(line)
+    return "\n".join(lines).strip()[:MAX_CONTACT_CHARS]
+
+
+def split_sections(cv_text: str) -> Dict[str, str]:
+    """
+    Divide el texto del CV en secciones usando los encabezados más comunes.
+    El texto previo al primer encabezado se asigna a "contact".
+
+    Retorna un diccionario vacío si el seccionado no es fiable: pocos
+    encabezados, encabezados contiguos de secciones distintas, una sección
+    vacía con su encabezado presente o un preámbulo de contacto demasiado largo.
+    Los encabezados repetidos seguidos de una misma sección (CV bilingües,
+    "EDUCACIÓN" / "EDUCATION") cuentan como uno.
+    """
+    buffers: Dict[str, List[str]] = {"contact": []}
+    current = "contact"
+    headings = 0
+    awaiting_content = False
+
+    for line in cv_text.splitlines():
+        section = _match_heading(line)
+        if section:
+            if awaiting_content:
+                if section != current:
+                    return {}
+                continue
+            current = section
+            buffers.setdefault(current, [])
+            headings += 1
+            awaiting_content = True
+            continue
+        if line.strip():
+            awaiting_content = False
+        buffers[current].append(line)
+
+    if headings < MIN_HEADINGS:
+        return {}
+
+    sections = {}
+    for name, lines in buffers.items():
+        content = "\n".join(lines).strip()
+        if not content and name != "contact":
+            return {}
+        if content:
+            sections[name] = content
+
+    if len(sections.get("contact", "")) > MAX_CONTACT_CHARS:
+        return {}
+    return {name: sections[name] for name in SECTION_NAMES if name in sections}
+
+
+def section_fingerprint(content: str) -> str:
+    """Huella de una sección, insensible a cambios de espaciado."""
+    normalized = " ".join(content.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def diff_sections(old: Dict[str, str], new: Dict[str, str]) -> List[str]:
+    """Retorna los nombres de las secciones nuevas o modificadas."""
+    return [
+        name for name, content in new.items()
+        if name not in old or section_fingerprint(old[name]) != section_fingerprint(content)
+    ]
+
+
+def merge_sections(base: Optional[ProfileCreate], parsed: Dict[str, BaseModel]) -> ProfileCreate:
+    """
+    Combina los resultados por sección sobre un perfil base (opcional)
+    y valida el resultado como ProfileCreate.
+    """
+    data = base.model_dump() if base else {}
+    for section_data in parsed.values():
+        data.update(section_data.model_dump())
+    # Un CV sin sección de habilidades o idiomas produce listas vacías
+    data.setdefault("skills", [])
+    data.setdefault("languages", [])
+    return ProfileCreate.model_validate(data)
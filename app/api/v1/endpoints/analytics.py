@@ -0,0 +1,63 @@
+# app/api/v1/endpoints/analytics.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.database import get_db, async_session
+from app.middleware.auth_middleware import require_admin
+from app.service.analytics_service import (
+    get_top_skills,
+    get_skill_cooccurrence,
+    get_language_distribution,
+    get_top_roles,
+    reconcile_analytics,
+)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/skills")
+async def top_skills(limit: int = Query(20, ge=1, le=500),
+                     db: AsyncSession = Depends(get_db),
+                     user: dict = Depends(require_admin())
+                     ):
+    """Habilidades más frecuentes, con el número de perfiles que las declaran."""
+    return await get_top_skills(db, limit)
+
+
+@router.get("/skills/{skill}/co-occurrence")
+async def skill_cooccurrence(skill: str,
+                             limit: int = Query(20, ge=1, le=500),
+                             db: AsyncSession = Depends(get_db),
+                             user: dict = Depends(require_admin())
+                             ):
+    """Habilidades que aparecen con más frecuencia junto a `skill` en un mismo perfil."""
+    return await get_skill_cooccurrence(db, skill, limit)
+
+
+@router.get("/languages")
+async def language_distribution(language: Optional[str] = None,
+                                db: AsyncSession = Depends(get_db),
+                                user: dict = Depends(require_admin())
+                                ):
+    """Distribución de niveles por idioma, opcionalmente para un único idioma."""
+    return await get_language_distribution(db, language)
+
+
+@router.get("/roles")
+async def top_roles(limit: int = Query(20, ge=1, le=500),
+                    db: AsyncSession = Depends(get_db),
+                    user: dict = Depends(require_admin())
+                    ):
+    """Cargos más frecuentes, separando las experiencias actuales de las pasadas."""
+    return await get_top_roles(db, limit)
+
+
+@router.post("/reconcile")
+async def reconcile(user: dict = Depends(require_admin())):
+    """Recalcula los agregados y retorna las filas corregidas por tabla."""
+    report = await reconcile_analytics(async_session)
+    if report is None:
+        raise HTTPException(status_code=409, detail="Ya hay una reconciliación en curso")
+    return report
@@ -1,17 +1,40 @@
 # app/api/v1/endpoints/profile.py
 
-from typing import List
-
-from fastapi import FastAPI, UploadFile, File, HTTPException, APIRouter, Depends
-from sqlalchemy.orm import Session
-
-from app.agent.loader import extract_text_with_pypdfloader
-from app.agent.model import parse_cv_with_openai
-from app.config.database import get_db
-from app.core.model.profile import Profile
-from app.middleware.auth_middleware import require_auth
-from app.service.profiler_service import save_to_database
-import os
+from datetime import datetime
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+from uuid import UUID
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, APIRouter, Depends, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.chain import parse_cv_incremental
+from app.agent.loader import extract_cv_text
+from app.agent.model import astream_cv_with_openai
+from app.config.database import get_db, async_session
+from app.core.schemas.profile import ProfileCreate
+from app.core.storage.blob_store import get_blob_store
+from app.core.tracing.tracer import traced
+from app.middleware.admission_middleware import (
+    require_upload_admission,
+    require_upload_rate_limit,
+    upload_admission,
+)
+from app.middleware.auth_middleware import require_auth, require_admin
+from app.service.import_service import import_profiles, IMPORT_BATCH_SIZE
+from app.service.export_service import export_profiles, EXPORT_MEDIA_TYPES, PARQUET_AVAILABLE
+from app.service.profiler_service import (
+    save_to_database,
+    get_latest_cv_document,
+    get_profile_by_user_id,
+    get_document,
+    serialize_experience,
+    serialize_education,
+)
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,84 +42,284 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/profile", tags=["profile"])
 
 
+@traced("pdf.extract")
+def _extract_cv_text(blob_key: str) -> Tuple[str, int]:
+    """Extrae el texto del PDF y retorna el texto junto con el número de páginas."""
+    with get_blob_store().materialize(blob_key) as file_path:
+        result = extract_cv_text(file_path)
+    if result.truncated:
+        logger.warning(f"Texto de {blob_key} truncado a {len(result.text)} caracteres")
+    return result.text, result.page_count
+
+
+def _content_disposition(file_name: str) -> str:
+    """
+    Cabecera Content-Disposition de descarga, como la construye FileResponse:
+    los nombres no ASCII o con comillas se envían codificados en filename*.
+    """
+    quoted = quote(file_name)
+    if quoted != file_name:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{file_name}"'
+
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Interpreta una cabecera Range de un único rango ("bytes=inicio-fin")."""
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start, _, end = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start:
+            first, last = int(start), int(end) if end else size - 1
+        else:
+            first, last = max(size - int(end), 0), size - 1
+    except ValueError:
+        return None
+    if first > last or first >= size:
+        raise HTTPException(status_code=416, detail="Rango no satisfacible",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return first, min(last, size - 1)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Formatea un evento server-sent events."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
 @router.post("/upload-cv")
 async def upload_cv(file: UploadFile = File(...),
-                    db: Session = Depends(get_db),
-                    user: dict = Depends(require_auth())
+                    db: AsyncSession = Depends(get_db),
+                    user: dict = Depends(require_upload_admission())
                     ):
     user_id = user.get("userId")  # Extraer el `user_id` del token validado
 
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Solo se aceptan archivos PDF.")
 
-    # Guarda el archivo localmente
-    directory = "uploaded_files/"
-    if not os.path.exists(directory):
-        os.makedirs(directory)  # Crear el directorio si no existe
-
-    file_path = os.path.join(directory, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+    # Guarda el archivo en el almacén direccionado por contenido; si la carga falla,
+    # el blob sin referencias lo elimina la limpieza periódica (BlobSweeper)
+    content = await file.read()
+    blob_key = await run_in_threadpool(get_blob_store().put, content)
 
-    # Extrae texto usando PyPDFLoader
+    # Extrae el texto con el motor de extracción configurado
     try:
-        pages = extract_text_with_pypdfloader(file_path)
-        cv_text = " ".join([page.page_content for page in pages])  # Unimos el contenido de todas las páginas
+        cv_text, _ = await run_in_threadpool(_extract_cv_text, blob_key)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al leer el PDF: {str(e)}")
 
-    # Procesa el texto con OpenAI
+    # Procesa el texto con OpenAI, reutilizando las secciones sin cambios de la carga anterior
+    previous = await get_latest_cv_document(db, user_id)
+    await db.commit()  # Libera la conexión mientras se espera al modelo
     try:
-        parsed_data = parse_cv_with_openai(cv_text)
+        parsed_data = await parse_cv_incremental(
+            cv_text,
+            previous.extracted_text if previous else None,
+            previous.parsed_data if previous else None,
+        )
     except Exception as e:
-        logger.error(f"Error al leer el PDF: {e}")
-        print(f"Error al leer el PDF: {e}")
+        logger.error(f"Error al procesar el CV: {e}")
         raise HTTPException(status_code=500, detail=f"Error al procesar el CV: {str(e)}")
 
     # Guarda los datos en la base de datos
-    profile = save_to_database(parsed_data, file.filename, file_path, db, user_id)
+    profile = await save_to_database(parsed_data, file.filename, get_blob_store().locate(blob_key), db, user_id,
+                               extracted_text=cv_text, blob_key=blob_key, size=len(content))
 
     return {"profile_id": profile.id, "parsed_data": parsed_data}
 
 
+@router.post("/upload-cv/stream")
+async def upload_cv_stream(file: UploadFile = File(...),
+                           user: dict = Depends(require_upload_rate_limit())
+                           ):
+    """
+    Variante en streaming de /upload-cv. Emite server-sent events por etapa:
+    stored, extracted, parsing, partial (campos de primer nivel que cambiaron
+    desde el parcial anterior, como mucho uno cada STREAM_PARTIAL_INTERVAL),
+    done (id del perfil guardado) o error.
+    """
+    user_id = user.get("userId")  # Extraer el `user_id` del token validado
+
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Solo se aceptan archivos PDF.")
+
+    # Rechaza antes de abrir el stream si no hay capacidad
+    upload_admission.check_capacity()
+
+    # El archivo se lee antes de iniciar la respuesta, mientras la petición sigue abierta
+    file_name = file.filename
+    content = await file.read()
+
+    async def event_stream():
+        try:
+            async with upload_admission.slot():
+                async for event in _admitted_stream():
+                    yield event
+        except HTTPException as e:
+            yield _sse_event("error", {"detail": e.detail, "retry_after": e.headers.get("Retry-After")})
+
+    async def _admitted_stream():
+        store = get_blob_store()
+        blob_key = await run_in_threadpool(store.put, content)
+        yield _sse_event("stored", {"file_name": file_name, "size": len(content), "blob_key": blob_key})
+
+        # La sesión se abre aquí: las dependencias con yield se cierran antes del streaming
+        async with async_session() as db:
+            async for event in _process_stream(db, store, blob_key):
+                yield event
+
+    async def _process_stream(db: AsyncSession, store, blob_key: str):
+        try:
+            cv_text, page_count = await run_in_threadpool(_extract_cv_text, blob_key)
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error al leer el PDF: {str(e)}"})
+            return
+        yield _sse_event("extracted", {"pages": page_count, "chars": len(cv_text)})
+
+        yield _sse_event("parsing", {})
+        parsed_data = None
+        try:
+            async for result in astream_cv_with_openai(cv_text):
+                if isinstance(result, ProfileCreate):
+                    parsed_data = result
+                else:
+                    yield _sse_event("partial", result)
+        except Exception as e:
+            logger.error(f"Error al procesar el CV: {e}")
+            yield _sse_event("error", {"detail": f"Error al procesar el CV: {str(e)}"})
+            return
+
+        try:
+            profile = await save_to_database(
+                parsed_data, file_name, store.locate(blob_key), db, user_id,
+                cv_text, blob_key, len(content)
+            )
+            yield _sse_event("done", {"profile_id": str(profile.id), "parsed_data": parsed_data})
+        except Exception as e:
+            logger.error(f"Error al guardar el perfil: {e}")
+            yield _sse_event("error", {"detail": f"Error al guardar el perfil: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/documents/{document_id}/file")
+async def download_document(document_id: UUID,
+                            request: Request,
+                            db: AsyncSession = Depends(get_db),
+                            user: dict = Depends(require_auth())
+                            ):
+    """
+    Descarga el archivo de un documento. Admite peticiones Range; los blobs sin
+    comprimir se sirven directamente desde disco sin copias intermedias.
+    """
+    document = await get_document(db, document_id)
+    if not document or not document.blob_key:
+        raise HTTPException(status_code=404, detail="Documento no encontrado")
+    if document.profile.user_id != user.get("userId") and "ADMIN" not in user.get("roles", []):
+        raise HTTPException(status_code=403, detail="Permisos insuficientes")
+
+    store = get_blob_store()
+    if not store.exists(document.blob_key):
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+
+    # FileResponse gestiona Range y delega el envío al servidor (pathsend) cuando lo soporta
+    path = store.local_path(document.blob_key)
+    if path:
+        return FileResponse(path, media_type=document.mime_type, filename=document.file_name)
+
+    size = document.size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": _content_disposition(document.file_name),
+    }
+    byte_range = _parse_range(request.headers.get("range"), size) if size else None
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(store.iter_bytes(document.blob_key, start, end), status_code=206,
+                                 media_type=document.mime_type, headers=headers)
+
+    if size:
+        headers["Content-Length"] = str(size)
+    return StreamingResponse(store.iter_bytes(document.blob_key), media_type=document.mime_type, headers=headers)
+
+
+@router.get("/export")
+async def export_profiles_endpoint(format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+                                   updated_since: Optional[datetime] = None,
+                                   updated_until: Optional[datetime] = None,
+                                   user: dict = Depends(require_admin())
+                                   ):
+    """
+    Exporta todos los perfiles en NDJSON, CSV o Parquet con memoria constante.
+    `updated_since` / `updated_until` permiten exportaciones incrementales.
+    """
+    if format == "parquet" and not PARQUET_AVAILABLE:
+        raise HTTPException(status_code=400, detail="La exportación a Parquet no está disponible")
+
+    async def stream():
+        # La sesión se abre aquí: las dependencias con yield se cierran antes del streaming
+        async with async_session() as db:
+            async for chunk in export_profiles(db, format, updated_since, updated_until):
+                yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="profiles.{format}"'},
+    )
+
+
+async def _iter_upload_lines(file: UploadFile, chunk_size: int = 1024 * 1024):
+    """
+    Lee un archivo subido línea a línea sin cargarlo completo en memoria.
+    Las líneas se entregan en bytes: import_profiles informa por línea las que no son UTF-8.
+    """
+    remainder = b""
+    while chunk := await file.read(chunk_size):
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line
+    if remainder:
+        yield remainder
+
+
+@router.post("/import")
+async def import_profiles_endpoint(file: UploadFile = File(...),
+                                   batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=10000),
+                                   db: AsyncSession = Depends(get_db),
+                                   user: dict = Depends(require_admin())
+                                   ):
+    """
+    Importa perfiles ya estructurados desde JSON lines (`user_id` + campos de
+    ProfileCreate) mediante COPY y upsert por lotes, sin pasar por el modelo.
+    """
+    report = await import_profiles(db, _iter_upload_lines(file), batch_size)
+    return report.to_dict()
+
+
 @router.get("/{user_id}")
-async def get_profile_by_id(user_id: str, db: Session = Depends(get_db)):
+async def get_profile_by_id(user_id: str, db: AsyncSession = Depends(get_db)):
     """
     Recupera un perfil específico por su ID.
     """
-    profile = db.query(Profile).filter(Profile.user_id == user_id).first()
+    profile = await get_profile_by_user_id(db, user_id)
 
     if not profile:
         raise HTTPException(status_code=404, detail="Perfil no encontrado")
 
     # Serializar datos relacionados del perfil
-    experiences = [
-        {
-            "company_name": exp.company_name,
-            "position": exp.position,
-            "location": exp.location,
-            "start_date": exp.start_date.isoformat() if exp.start_date else None,
-            "end_date": exp.end_date.isoformat() if exp.end_date else None,
-            "current": exp.current,
-            "description": exp.description,
-        }
-        for exp in profile.experiences
-    ]
-
-    education = [
-        {
-            "institution_name": edu.institution_name,
-            "degree": edu.degree,
-            "field_of_study": edu.field_of_study,
-            "start_date": edu.start_date.isoformat() if edu.start_date else None,
-            "end_date": edu.end_date.isoformat() if edu.end_date else None,
-            "description": edu.description,
-        }
-        for edu in profile.education
-    ]
+    experiences = [serialize_experience(exp) for exp in profile.experiences]
+    education = [serialize_education(edu) for edu in profile.education]
 
     documents = [
         {
+            "id": str(doc.id),
             "file_name": doc.file_name,
             "file_url": doc.file_url,
             "parsed_data": doc.parsed_data,
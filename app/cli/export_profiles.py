@@ -0,0 +1,42 @@
+# app/cli/export_profiles.py
+"""
+Exporta los perfiles en NDJSON, CSV o Parquet.
+
+Uso:
+    python -m app.cli.export_profiles --format ndjson --output profiles.ndjson
+    python -m app.cli.export_profiles --format csv --updated-since 2025-01-01T00:00:00 > cambios.csv
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from app.config.database import async_session, async_engine
+from app.service.export_service import export_profiles, EXPORT_FORMATS, EXPORT_BATCH_SIZE
+
+
+async def run(args):
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async with async_session() as db:
+            async for chunk in export_profiles(db, args.format, args.updated_since,
+                                               args.updated_until, args.batch_size):
+                output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+        await async_engine.dispose()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    arg_parser.add_argument("--output", help="Archivo de salida (por defecto, stdout)")
+    arg_parser.add_argument("--updated-since", type=datetime.fromisoformat)
+    arg_parser.add_argument("--updated-until", type=datetime.fromisoformat)
+    arg_parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    asyncio.run(run(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# app/cli/import_profiles.py
+"""
+Importa perfiles ya estructurados desde JSON lines mediante COPY.
+Cada línea contiene `user_id` y los campos de ProfileCreate.
+
+Uso:
+    python -m app.cli.import_profiles candidatos.jsonl --batch-size 2000
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from app.config.database import async_session, async_engine
+from app.service.import_service import import_profiles, IMPORT_BATCH_SIZE
+
+
+async def run(args):
+    # En binario: las líneas que no son UTF-8 se informan como error de línea
+    source = open(args.input, "rb") if args.input != "-" else sys.stdin.buffer
+    try:
+        async with async_session() as db:
+            report = await import_profiles(db, source, args.batch_size)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        await async_engine.dispose()
+
+    result = report.to_dict()
+    errors = result.pop("errors")
+    for error in errors:
+        print(json.dumps(error, ensure_ascii=False), file=sys.stderr)
+    print(json.dumps(result))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("input", help="Archivo JSON lines ('-' para stdin)")
+    arg_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    asyncio.run(run(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# app/cli/reconcile_analytics.py
+"""
+Recalcula los agregados de analítica desde los perfiles y corrige la deriva.
+
+Uso:
+    python -m app.cli.reconcile_analytics
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from app.config.database import async_session, async_engine
+from app.service.analytics_service import reconcile_analytics
+
+
+async def run(args):
+    try:
+        report = await reconcile_analytics(async_session)
+    finally:
+        await async_engine.dispose()
+
+    if report is None:
+        print("Ya hay una reconciliación en curso", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(report))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    asyncio.run(run(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncpg
+import logging
 import os
+import time
 from dotenv import load_dotenv
-from psycopg2 import connect, sql
+
+logger = logging.getLogger(__name__)
 
 # Cargar variables de entorno
 environment = os.getenv("ENVIRONMENT", "development")
@@ -20,54 +24,106 @@ POSTGRES_USER = os.getenv("DB_USER")
 POSTGRES_PASSWORD = os.getenv("DB_PASSWORD")
 
 # Parámetros del pool
-DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
 DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
 DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+# Caché de sentencias preparadas de asyncpg (por conexión)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 500))
+
+# Umbral para registrar consultas lentas, en milisegundos
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+
+def _quote_identifier(name: str) -> str:
+    """Cita un identificador de PostgreSQL duplicando las comillas dobles internas."""
+    return '"' + name.replace('"', '""') + '"'
 
 
 # Crear la base de datos si no existe
-def create_database_if_not_exists():
-    conn = connect(
-        dbname="postgres",
+async def create_database_if_not_exists():
+    conn = await asyncpg.connect(
+        database="postgres",
         user=POSTGRES_USER,
         password=POSTGRES_PASSWORD,
         host=POSTGRES_HOST,
         port=POSTGRES_PORT
     )
-    conn.autocommit = True
-    cursor = conn.cursor()
+    try:
+        exists = await conn.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", POSTGRES_DB)
+        if not exists:
+            await conn.execute(f"CREATE DATABASE {_quote_identifier(POSTGRES_DB)}")
+            logger.info(f"Base de datos '{POSTGRES_DB}' creada con éxito.")
+        else:
+            logger.info(f"La base de datos '{POSTGRES_DB}' ya existe.")
+    finally:
+        await conn.close()
+
+
+# URL de la base de datos
+SQLALCHEMY_DATABASE_URL_ASYNC = (
+    f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    f"?prepared_statement_cache_size={DB_STATEMENT_CACHE_SIZE}"
+)
+
+
+class PoolTelemetry:
+    """Métricas del pool: espera de checkout, utilización y consultas lentas."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.slow_queries = 0
 
-    cursor.execute(f"SELECT 1 FROM pg_database WHERE datname = '{POSTGRES_DB}'")
-    exists = cursor.fetchone()
+    def record_checkout_wait(self, seconds: float):
+        self.checkouts += 1
+        self.checkout_wait_total += seconds
+        self.checkout_wait_max = max(self.checkout_wait_max, seconds)
 
-    if not exists:
-        cursor.execute(sql.SQL("CREATE DATABASE {}").format(
-            sql.Identifier(POSTGRES_DB)
-        ))
-        print(f"Base de datos '{POSTGRES_DB}' creada con éxito.")
-    else:
-        print(f"La base de datos '{POSTGRES_DB}' ya existe.")
+    def snapshot(self) -> dict:
+        pool = async_engine.pool
+        capacity = DB_POOL_SIZE + DB_MAX_OVERFLOW
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "capacity": capacity,
+            "utilization": pool.checkedout() / capacity if capacity else 0.0,
+            "checkouts": self.checkouts,
+            "checkout_wait_avg_ms": (self.checkout_wait_total / self.checkouts * 1000) if self.checkouts else 0.0,
+            "checkout_wait_max_ms": self.checkout_wait_max * 1000,
+            "slow_queries": self.slow_queries,
+        }
 
-    cursor.close()
-    conn.close()
 
+pool_telemetry = PoolTelemetry()
 
-# URLs de la base de datos
-SQLALCHEMY_DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-SQLALCHEMY_DATABASE_URL_ASYNC = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-# Configuración de engines
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Pool que mide el tiempo de espera de cada checkout."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_telemetry.record_checkout_wait(time.perf_counter() - started)
+
+
+# Configuración del engine
+async_engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL_ASYNC,
+    echo=DB_ECHO,
+    poolclass=InstrumentedPool,
     pool_size=DB_POOL_SIZE,
     max_overflow=DB_MAX_OVERFLOW,
     pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
     pool_pre_ping=True
 )
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-async_engine = create_async_engine(SQLALCHEMY_DATABASE_URL_ASYNC, echo=True)
 async_session = async_sessionmaker(
     async_engine,
     expire_on_commit=False,
@@ -75,17 +131,38 @@ async_session = async_sessionmaker(
 )
 
 
+# Registro de consultas lentas en lugar de echo
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+    if elapsed_ms >= DB_SLOW_QUERY_MS:
+        pool_telemetry.slow_queries += 1
+        logger.warning(f"Consulta lenta ({elapsed_ms:.1f} ms): {statement}")
+
+
+@event.listens_for(async_engine.sync_engine, "handle_error")
+def _handle_error(context):
+    if context.connection is not None and context.connection.info.get("query_start_time"):
+        context.connection.info["query_start_time"].pop()
+
+
 # Inicializar la base de datos
-def init_db():
-    create_database_if_not_exists()
+async def init_db():
+    await create_database_if_not_exists()
     from app.config.base import Base
-    Base.metadata.create_all(bind=engine)
+    import app.core.model.profile  # noqa: F401 - registra los modelos en Base.metadata
+    import app.core.model.outbox  # noqa: F401
+    import app.core.model.analytics  # noqa: F401
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
 
 
 # Dependencia para obtener una sesión de base de datos
-def get_db() -> Session:
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncSession:
+    async with async_session() as db:
         yield db
-    finally:
-        db.close()
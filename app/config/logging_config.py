@@ -0,0 +1,99 @@
+import copy
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+import structlog
+
+from app.core.tracing.tracer import current_trace_id
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# "json" para registros estructurados o "console" para desarrollo
+LOG_RENDERER = os.getenv("LOG_RENDERER", "json")
+
+# Registros pendientes de escribir; si la cola se llena se descartan en lugar de bloquear
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+_listener: Optional[QueueListener] = None
+
+
+class TraceIdFilter(logging.Filter):
+    """Añade el trace_id de la petición en curso a cada registro."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler que descarta registros con la cola llena y difiere el formateo al listener."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Los eventos de structlog llevan un dict que renderiza el listener
+        if isinstance(record.msg, dict):
+            return copy.copy(record)
+        return super().prepare(record)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging():
+    """
+    Configura logging y structlog para escribir a través de una cola: la
+    petición solo encola el registro y un hilo aparte lo renderiza y escribe.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    shared_processors = [
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.add_logger_name,
+        structlog.processors.TimeStamper(fmt="iso", utc=True),
+    ]
+    renderer = structlog.dev.ConsoleRenderer(colors=False) if LOG_RENDERER == "console" \
+        else structlog.processors.JSONRenderer()
+
+    structlog.configure(
+        processors=[structlog.stdlib.filter_by_level, *shared_processors,
+                    structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(structlog.stdlib.ProcessorFormatter(
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, renderer],
+        foreign_pre_chain=[*shared_processors, structlog.stdlib.ExtraAdder(["trace_id"])],
+    ))
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(TraceIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Detiene el listener tras escribir los registros pendientes."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,76 @@
+# rate_limiter.py
+import logging
+import os
+import time
+from typing import Tuple
+
+from redis.asyncio import Redis
+
+from app.core.datastore.redis_connector import get_redis_connection
+from app.core.tracing.tracer import traced
+
+logger = logging.getLogger(__name__)
+
+# Parámetros del token bucket por usuario
+UPLOAD_RATE_CAPACITY = int(os.getenv("UPLOAD_RATE_CAPACITY", 5))
+UPLOAD_RATE_REFILL_PER_SEC = float(os.getenv("UPLOAD_RATE_REFILL_PER_SEC", 5 / 60))
+
+# Recarga y consumo atómicos del bucket en Redis
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    retry_after = (requested - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class TokenBucketRateLimiter:
+    def __init__(self, redis: Redis,
+                 capacity: int = UPLOAD_RATE_CAPACITY,
+                 refill_per_sec: float = UPLOAD_RATE_REFILL_PER_SEC,
+                 prefix: str = "ratelimit:upload"):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.prefix = prefix
+        self.script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    @traced("redis.rate_limit")
+    async def acquire(self, user_id: str, tokens: int = 1) -> Tuple[bool, float]:
+        """
+        Consume tokens del bucket del usuario.
+        Retorna si la petición se admite y, si no, los segundos hasta poder reintentar.
+        """
+        try:
+            allowed, retry_after = await self.script(
+                keys=[f"{self.prefix}:{user_id}"],
+                args=[self.capacity, self.refill_per_sec, time.time(), tokens]
+            )
+            return bool(int(allowed)), float(retry_after)
+        except Exception as e:
+            # Si Redis no está disponible se admite la petición en lugar de bloquear la carga
+            logger.error(f"Error consultando el rate limit en Redis: {str(e)}")
+            return True, 0.0
+
+
+async def get_rate_limiter() -> TokenBucketRateLimiter:
+    """Factory para obtener una instancia de TokenBucketRateLimiter"""
+    redis = await get_redis_connection()
+    return TokenBucketRateLimiter(redis)
@@ -5,6 +5,7 @@ import logging
 from redis.asyncio import Redis
 
 from app.core.datastore.redis_connector import get_redis_connection
+from app.core.tracing.tracer import traced
 
 logger = logging.getLogger(__name__)
 
@@ -12,10 +13,10 @@ class RedisService:
     def __init__(self, redis: Redis):
         self.redis = redis
 
+    @traced("redis.set_user_info")
     async def set_user_info(self, user_id: str, user_data: dict):
         """Almacena información del usuario en Redis"""
         try:
-            print(f"user:{user_id}")
             name = f"user:{user_id}"
             await self.redis.set(
                 name,
@@ -26,6 +27,7 @@ class RedisService:
             logger.error(f"Error setting user in Redis: {str(e)}")
             raise e
 
+    @traced("redis.get_user_info")
     async def get_user_info(self, user_id: str) -> Optional[dict]:
         """Obtiene la información del usuario desde Redis"""
         try:
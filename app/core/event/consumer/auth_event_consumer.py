@@ -63,7 +63,7 @@ class AuthEventConsumer:
             logger.info("Consumidor iniciado y esperando mensajes...")
 
             async for message in self.consumer:
-                logger.info(f"Mensaje recibido: {message.value}")
+                logger.debug("Mensaje recibido: tipo=%s offset=%s", message.value.get('type'), message.offset)
                 await self.process_auth_event(message.value)
 
         except Exception as e:
@@ -0,0 +1,181 @@
+# outbox_relay.py
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+import aiokafka
+from sqlalchemy import select, update, delete
+
+from app.config.database import async_session
+from app.core.exceptions import KafkaError
+from app.core.model.outbox import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
+PROFILE_EVENTS_TOPIC = os.getenv("PROFILE_EVENTS_TOPIC", "profile-events")
+KAFKA_COMPRESSION = os.getenv("KAFKA_COMPRESSION", "gzip")
+
+# Parámetros del relay
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 500))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 1.0))
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", 7))
+OUTBOX_CLEANUP_INTERVAL = 3600  # segundos
+
+# Espera máxima (segundos) entre reintentos cuando Kafka no está disponible
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", 60))
+
+# Intentos fallidos tras los que un evento queda aparcado y el relay deja de reclamarlo
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 10))
+
+
+def _backoff_delay(failures: int) -> float:
+    """Espera exponencial a partir del intervalo de sondeo, acotada por OUTBOX_BACKOFF_MAX."""
+    return min(OUTBOX_BACKOFF_MAX, OUTBOX_POLL_INTERVAL * 2 ** min(failures, 16))
+
+
+class OutboxRelay:
+    """
+    Publica en Kafka, por lotes, los eventos registrados en la tabla de outbox.
+    Cada lote se bloquea con SKIP LOCKED, de modo que varias instancias pueden
+    ejecutar el relay sin publicar dos veces el mismo evento.
+    """
+
+    def __init__(self):
+        self.producer = aiokafka.AIOKafkaProducer(
+            bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+            enable_idempotence=True,
+            acks="all",
+            compression_type=KAFKA_COMPRESSION,
+            linger_ms=20,
+            key_serializer=lambda k: k.encode("utf-8"),
+            value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+        )
+        self._last_cleanup = datetime.min
+
+    async def _publish(self, event: OutboxEvent):
+        """Envía un evento y espera su confirmación."""
+        ack = await self.producer.send(
+            PROFILE_EVENTS_TOPIC,
+            key=event.event_key,
+            value=event.payload,
+            headers=[
+                ("event_id", str(event.event_id).encode("utf-8")),
+                ("event_type", event.event_type.encode("utf-8")),
+            ],
+        )
+        return await ack
+
+    async def publish_batch(self) -> int:
+        """
+        Publica un lote de eventos pendientes. Retorna cuántos se publicaron.
+
+        Cada evento se confirma por separado: los publicados se marcan aunque
+        otros del lote fallen. Los errores reintentables de Kafka (broker caído,
+        timeouts) no cuentan como intento del evento; el resto sí, y al llegar a
+        OUTBOX_MAX_ATTEMPTS el evento queda aparcado fuera de los lotes.
+        """
+        async with async_session() as db:
+            result = await db.execute(
+                select(OutboxEvent)
+                .where(OutboxEvent.published_at.is_(None))
+                .where(OutboxEvent.attempts < OUTBOX_MAX_ATTEMPTS)
+                .order_by(OutboxEvent.id)
+                .limit(OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            events = result.scalars().all()
+            if not events:
+                await db.rollback()
+                return 0
+
+            # Se envía todo el lote y se espera la confirmación de cada mensaje
+            outcomes = await asyncio.gather(*(self._publish(event) for event in events), return_exceptions=True)
+
+            published = [event.id for event, outcome in zip(events, outcomes) if not isinstance(outcome, Exception)]
+            failed = [(event, outcome) for event, outcome in zip(events, outcomes) if isinstance(outcome, Exception)]
+            counted = [event for event, error in failed if not getattr(error, "retriable", False)]
+
+            if published:
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(published))
+                    .values(published_at=datetime.utcnow())
+                )
+            if counted:
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_([event.id for event in counted]))
+                    .values(attempts=OutboxEvent.attempts + 1)
+                )
+            await db.commit()
+
+            parked = [event for event in counted if (event.attempts or 0) + 1 >= OUTBOX_MAX_ATTEMPTS]
+            if parked:
+                logger.error(
+                    f"Eventos de outbox aparcados tras {OUTBOX_MAX_ATTEMPTS} intentos: "
+                    f"{', '.join(str(event.event_id) for event in parked)}"
+                )
+
+            if failed and not published:
+                raise KafkaError(f"Error publicando eventos de outbox: {str(failed[0][1])}")
+            if failed:
+                logger.warning(f"Eventos de outbox no publicados en este lote: {len(failed)}")
+            return len(published)
+
+    async def cleanup(self):
+        """Elimina los eventos publicados más antiguos que la retención."""
+        async with async_session() as db:
+            await db.execute(
+                delete(OutboxEvent).where(
+                    OutboxEvent.published_at < datetime.utcnow() - timedelta(days=OUTBOX_RETENTION_DAYS)
+                )
+            )
+            await db.commit()
+        self._last_cleanup = datetime.utcnow()
+
+    async def _start_producer(self):
+        """Arranca el productor reintentando con espera exponencial mientras Kafka no responda."""
+        failures = 0
+        while True:
+            try:
+                await self.producer.start()
+                return
+            except Exception as e:
+                delay = _backoff_delay(failures)
+                logger.error(f"No se pudo conectar con Kafka, reintento en {delay:.0f}s: {str(e)}")
+                failures += 1
+                await asyncio.sleep(delay)
+
+    async def start(self):
+        """Inicia el relay de eventos de perfil"""
+        logger.info("Iniciando relay de eventos de perfil...")
+        await self._start_producer()
+        try:
+            failures = 0
+            while True:
+                try:
+                    published = await self.publish_batch()
+                    if published:
+                        logger.debug(f"Eventos de perfil publicados: {published}")
+                    if datetime.utcnow() - self._last_cleanup > timedelta(seconds=OUTBOX_CLEANUP_INTERVAL):
+                        await self.cleanup()
+                    failures = 0
+                except KafkaError as e:
+                    logger.error(str(e))
+                    await asyncio.sleep(_backoff_delay(failures))
+                    failures += 1
+                    continue
+                except Exception as e:
+                    logger.error(f"Error en el relay de outbox: {str(e)}")
+                    await asyncio.sleep(_backoff_delay(failures))
+                    failures += 1
+                    continue
+
+                # Con un lote completo se continúa de inmediato; si no, se espera
+                if published < OUTBOX_BATCH_SIZE:
+                    await asyncio.sleep(OUTBOX_POLL_INTERVAL)
+        finally:
+            await self.producer.stop()
@@ -0,0 +1,41 @@
+# analytics_reconciler.py
+import asyncio
+import logging
+import os
+
+from app.config.database import async_session
+from app.service.analytics_service import reconcile_analytics
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre reconciliaciones de los agregados de analítica, en segundos; 0 la desactiva
+ANALYTICS_RECONCILE_INTERVAL = float(os.getenv("ANALYTICS_RECONCILE_INTERVAL", 3600))
+
+
+class AnalyticsReconciler:
+    """
+    Recalcula periódicamente los agregados de analítica para corregir la deriva
+    del mantenimiento incremental, sin bloquear las escrituras. Con varias
+    instancias, solo una reconcilia cada vez gracias al advisory lock.
+    """
+
+    def __init__(self, interval: float = ANALYTICS_RECONCILE_INTERVAL):
+        self.interval = interval
+
+    async def reconcile(self):
+        report = await reconcile_analytics(async_session)
+        if report is None:
+            logger.debug("Reconciliación de analítica en curso en otra instancia")
+        elif any(report.values()):
+            logger.warning(f"Agregados de analítica corregidos en la reconciliación: {report}")
+        return report
+
+    async def start(self):
+        """Inicia la reconciliación periódica de los agregados"""
+        logger.info("Iniciando reconciliación periódica de analítica...")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Error en la reconciliación de analítica: {str(e)}")
@@ -0,0 +1,45 @@
+# blob_sweeper.py
+import asyncio
+import logging
+import os
+
+from app.config.database import async_session
+from app.core.storage.blob_store import get_blob_store
+from app.service.profiler_service import sweep_orphan_blobs
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre limpiezas de blobs huérfanos, en segundos; 0 la desactiva
+BLOB_GC_INTERVAL = float(os.getenv("BLOB_GC_INTERVAL", 3600))
+
+# Antigüedad mínima de un blob sin referencias para eliminarlo; debe superar
+# con holgura la duración de una carga
+BLOB_GC_GRACE_SECONDS = float(os.getenv("BLOB_GC_GRACE_SECONDS", 86400))
+
+
+class BlobSweeper:
+    """
+    Elimina periódicamente los blobs de cargas fallidas. Las cargas no borran
+    blobs: otra carga simultánea del mismo archivo podría estar por referenciarlo.
+    """
+
+    def __init__(self, interval: float = BLOB_GC_INTERVAL, grace_seconds: float = BLOB_GC_GRACE_SECONDS):
+        self.interval = interval
+        self.grace_seconds = grace_seconds
+
+    async def sweep(self) -> int:
+        async with async_session() as db:
+            removed = await sweep_orphan_blobs(db, get_blob_store(), self.grace_seconds)
+        if removed:
+            logger.info(f"Blobs huérfanos eliminados: {removed}")
+        return removed
+
+    async def start(self):
+        """Inicia la limpieza periódica de blobs"""
+        logger.info("Iniciando limpieza periódica de blobs...")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Error en la limpieza de blobs: {str(e)}")
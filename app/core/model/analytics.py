@@ -0,0 +1,55 @@
+from sqlalchemy import Column, String, BigInteger, Index, text
+
+from app.config.base import Base
+
+
+# Agregados mantenidos de forma incremental por la escritura de perfiles.
+# Las claves se guardan normalizadas (espacios colapsados y en minúsculas);
+# label conserva la forma en que se vio por primera vez.
+
+class SkillCount(Base):
+    __tablename__ = "analytics_skill_counts"
+
+    skill = Column(String, primary_key=True)
+    label = Column(String)
+    profile_count = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_analytics_skill_counts_count", profile_count.desc()),
+    )
+
+
+class SkillPairCount(Base):
+    """Co-ocurrencia de habilidades; cada par se guarda en ambos sentidos."""
+    __tablename__ = "analytics_skill_pairs"
+
+    skill = Column(String, primary_key=True)
+    other_skill = Column(String, primary_key=True)
+    profile_count = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_analytics_skill_pairs_skill_count", skill, profile_count.desc()),
+    )
+
+
+class LanguageCount(Base):
+    __tablename__ = "analytics_language_counts"
+
+    language = Column(String, primary_key=True)
+    proficiency = Column(String, primary_key=True)
+    label = Column(String)
+    profile_count = Column(BigInteger, nullable=False, default=0)
+
+
+class RoleCount(Base):
+    """Experiencias por cargo, separadas en actuales y pasadas."""
+    __tablename__ = "analytics_role_counts"
+
+    position = Column(String, primary_key=True)
+    label = Column(String)
+    current_count = Column(BigInteger, nullable=False, default=0)
+    past_count = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_analytics_role_counts_total", text("(current_count + past_count) DESC")),
+    )
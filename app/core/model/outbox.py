@@ -0,0 +1,25 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, String, DateTime, BigInteger, Integer, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.config.base import Base
+
+
+class OutboxEvent(Base):
+    __tablename__ = "profile_outbox"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    event_id = Column(UUID(as_uuid=True), nullable=False, unique=True, default=uuid.uuid4)  # Clave de idempotencia
+    event_type = Column(String(50), nullable=False)
+    aggregate_id = Column(UUID(as_uuid=True), nullable=False)  # ID del perfil
+    event_key = Column(String, nullable=False)  # Clave de partición en Kafka (user_id)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    published_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0)
+
+    # Índice parcial sobre los eventos pendientes de publicar
+    __table_args__ = (
+        Index("ix_profile_outbox_pending", "id", postgresql_where=published_at.is_(None)),
+    )
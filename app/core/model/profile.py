@@ -22,7 +22,7 @@ class Profile(Base):
     skills = Column(ARRAY(String))
     languages = Column(ARRAY(JSONB))
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relaciones
     experiences = relationship("WorkExperience", back_populates="profile")
@@ -58,6 +58,7 @@ class Document(Base):
     type = Column(String(50))  # CV, portfolio, etc.
     file_name = Column(String(255))
     file_url = Column(String(500))
+    blob_key = Column(String(64), index=True, nullable=True)  # Hash del contenido en el almacén de archivos
     mime_type = Column(String(100))
     size = Column(Integer)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
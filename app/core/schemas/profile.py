@@ -69,3 +69,29 @@ class ProfileInDBBase(BaseModel):
 
 class Profile(ProfileInDBBase):
     pass
+
+
+# Sub-esquemas para la extracción por secciones del CV
+class ContactSection(BaseModel):
+    first_name: str
+    last_name: str
+    headline: Optional[str]
+    about: Optional[str]
+    location: Optional[dict]
+    contact_info: Optional[ContactInfo]
+
+
+class ExperienceSection(BaseModel):
+    experiences: List[WorkExperienceCreate] = []
+
+
+class EducationSection(BaseModel):
+    education: List[EducationCreate] = []
+
+
+class SkillsSection(BaseModel):
+    skills: List[str] = []
+
+
+class LanguagesSection(BaseModel):
+    languages: List[Language] = []
@@ -0,0 +1,221 @@
+# blob_store.py
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # La compresión es opcional
+    zstandard = None
+
+# Configuración del almacén de archivos
+BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local")
+BLOB_STORE_ROOT = os.getenv("BLOB_STORE_ROOT", "uploaded_files/blobs")
+BLOB_COMPRESSION = os.getenv("BLOB_COMPRESSION", "none")  # "none" o "zstd"
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobStore:
+    """
+    Almacén de archivos direccionado por contenido: la clave de cada blob es
+    el SHA-256 de su contenido, de modo que archivos idénticos se guardan una vez.
+    """
+
+    @staticmethod
+    def compute_key(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, data: bytes) -> str:
+        """
+        Guarda el contenido (si no existe ya) y retorna su clave. Si ya existe
+        se renueva su fecha, de modo que la limpieza respete el periodo de gracia.
+        """
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str, older_than: Optional[float] = None) -> bool:
+        """
+        Elimina el blob. Con `older_than` (timestamp) solo lo elimina si no se
+        ha escrito desde entonces. Retorna True si se eliminó.
+        """
+        raise NotImplementedError
+
+    def iter_keys(self, older_than: float) -> Iterator[str]:
+        """Claves de los blobs escritos por última vez antes de `older_than`."""
+        raise NotImplementedError
+
+    def clean_tmp(self, older_than: float) -> int:
+        """Elimina los temporales de escrituras interrumpidas. Retorna cuántos se eliminaron."""
+        return 0
+
+    def locate(self, key: str) -> str:
+        """Ubicación del blob en el backend (ruta, URL, etc.)."""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Ruta local del contenido sin comprimir, si existe, para servirlo sin copias."""
+        return None
+
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None,
+                   chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Genera el contenido original entre `start` y `end` (inclusive)."""
+        raise NotImplementedError
+
+    @contextmanager
+    def materialize(self, key: str) -> Iterator[str]:
+        """Expone el contenido original como archivo local mientras dure el contexto."""
+        path = self.local_path(key)
+        if path:
+            yield path
+            return
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+            for chunk in self.iter_bytes(key):
+                tmp.write(chunk)
+            tmp.flush()
+            yield tmp.name
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Backend sobre el sistema de archivos local, con directorios particionados
+    por prefijo del hash (ab/cd/abcd...) y compresión zstd opcional.
+    """
+
+    def __init__(self, root: str = BLOB_STORE_ROOT, compression: str = BLOB_COMPRESSION):
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("La compresión zstd requiere el paquete 'zstandard'")
+        self.root = root
+        self.compression = compression
+        os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+
+    def _path(self, key: str, compressed: bool) -> str:
+        suffix = ".zst" if compressed else ""
+        return os.path.join(self.root, key[:2], key[2:4], key + suffix)
+
+    def _find(self, key: str) -> Optional[str]:
+        for compressed in (False, True):
+            path = self._path(key, compressed)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, data: bytes) -> str:
+        key = self.compute_key(data)
+        existing = self._find(key)
+        if existing:
+            os.utime(existing)
+            return key
+
+        compressed = self.compression == "zstd"
+        path = self._path(key, compressed)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = zstandard.ZstdCompressor().compress(data) if compressed else data
+
+        # Escritura atómica: un lector nunca ve un blob a medio escribir
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, "tmp"))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return key
+
+    def exists(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def delete(self, key: str, older_than: Optional[float] = None) -> bool:
+        path = self._find(key)
+        if path is None:
+            return False
+        try:
+            if older_than is not None and os.stat(path).st_mtime >= older_than:
+                return False
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def iter_keys(self, older_than: float) -> Iterator[str]:
+        for directory, subdirs, files in os.walk(self.root):
+            if directory == self.root:
+                subdirs[:] = [d for d in subdirs if d != "tmp"]
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.stat(path).st_mtime < older_than:
+                        yield name[:-len(".zst")] if name.endswith(".zst") else name
+                except FileNotFoundError:
+                    continue
+
+    def clean_tmp(self, older_than: float) -> int:
+        removed = 0
+        tmp_dir = os.path.join(self.root, "tmp")
+        for name in os.listdir(tmp_dir):
+            path = os.path.join(tmp_dir, name)
+            try:
+                if os.stat(path).st_mtime < older_than:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def locate(self, key: str) -> str:
+        return self._find(key) or self._path(key, self.compression == "zstd")
+
+    def local_path(self, key: str) -> Optional[str]:
+        path = self._path(key, compressed=False)
+        return path if os.path.exists(path) else None
+
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None,
+                   chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        path = self._find(key)
+        if path is None:
+            raise FileNotFoundError(key)
+
+        with open(path, "rb") as raw:
+            if path.endswith(".zst"):
+                reader = zstandard.ZstdDecompressor().stream_reader(raw)
+                # El flujo comprimido no admite saltos: se descarta hasta `start`
+                to_skip = start
+                while to_skip > 0:
+                    skipped = reader.read(min(chunk_size, to_skip))
+                    if not skipped:
+                        return
+                    to_skip -= len(skipped)
+            else:
+                reader = raw
+                reader.seek(start)
+
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = reader.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+
+BLOB_STORES = {
+    "local": LocalBlobStore,
+}
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Factory para obtener la instancia configurada del almacén de archivos."""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BLOB_STORES[BLOB_STORE_BACKEND]()
+    return _blob_store
@@ -0,0 +1,162 @@
+# tracer.py
+import contextvars
+import functools
+import inspect
+import itertools
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+# Fracción de peticiones cuya traza se emite siempre
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.01))
+
+# Las peticiones más lentas que este umbral (ms) se emiten aunque no estén muestreadas; 0 lo desactiva
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", 2000))
+
+# Límite de spans registrados por traza
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", 256))
+
+TRACE_LOGGER = "app.trace"
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Trace:
+    """
+    Traza de una petición. Los spans se guardan como tuplas y solo se
+    convierten en un registro estructurado si la traza llega a emitirse.
+    """
+
+    __slots__ = ("trace_id", "name", "sampled", "started", "attrs", "spans", "dropped_spans", "_ids")
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, sampled: bool = False):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.attrs: Dict[str, Any] = {}
+        self.spans: List[Tuple] = []
+        self.dropped_spans = 0
+        self._ids = itertools.count(1)
+
+    def next_span_id(self) -> int:
+        return next(self._ids)
+
+    def add_span(self, name: str, span_id: int, parent_id: Optional[int],
+                 started: float, ended: float, attrs: dict, error: Optional[str]):
+        if len(self.spans) >= TRACE_MAX_SPANS:
+            self.dropped_spans += 1
+            return
+        self.spans.append((name, span_id, parent_id, started, ended, attrs, error))
+
+    def to_record(self, duration_ms: float, reason: str) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "reason": reason,
+            "duration_ms": round(duration_ms, 2),
+            **self.attrs,
+            "spans": [
+                {
+                    "name": name,
+                    "span_id": span_id,
+                    "parent_id": parent_id,
+                    "start_ms": round((started - self.started) * 1000, 2),
+                    "duration_ms": round((ended - started) * 1000, 2),
+                    **attrs,
+                    **({"error": error} if error else {}),
+                }
+                for name, span_id, parent_id, started, ended, attrs, error in self.spans
+            ],
+            "dropped_spans": self.dropped_spans,
+        }
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+def start_trace(name: str, trace_id: Optional[str] = None) -> Tuple[Trace, contextvars.Token]:
+    """Abre una traza en el contexto actual y decide el muestreo por tasa."""
+    trace = Trace(name, trace_id, sampled=random.random() < TRACE_SAMPLE_RATE)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(trace: Trace, token: contextvars.Token, **attrs) -> Optional[str]:
+    """
+    Cierra la traza y la emite si está muestreada, si fue lenta o si terminó
+    con error de servidor. Retorna el motivo de la emisión o None si se descarta.
+    """
+    _current_trace.reset(token)
+    duration_ms = (time.perf_counter() - trace.started) * 1000
+    trace.attrs.update(attrs)
+
+    if trace.sampled:
+        reason = "sampled"
+    elif TRACE_SLOW_MS and duration_ms >= TRACE_SLOW_MS:
+        reason = "slow"
+    elif trace.attrs.get("status", 0) >= 500:
+        reason = "error"
+    else:
+        return None
+
+    structlog.get_logger(TRACE_LOGGER).info("trace", **trace.to_record(duration_ms, reason))
+    return reason
+
+
+def annotate(**attrs):
+    """Añade atributos a la traza en curso (por ejemplo, el usuario autenticado)."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Mide un bloque como span anidado de la traza en curso.
+    Fuera de una traza no registra nada.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    span_id = trace.next_span_id()
+    parent_id = _current_span.get()
+    token = _current_span.set(span_id)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        trace.add_span(name, span_id, parent_id, started, time.perf_counter(), attrs, error)
+
+
+def traced(name: str):
+    """Decorador que envuelve una función, síncrona o asíncrona, en un span."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
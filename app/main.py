@@ -3,7 +3,8 @@ from fastapi import FastAPI
 import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1.endpoints import profiler
+from app.agent.loader import shutdown_pdf_pool
+from app.api.v1.endpoints import profiler, analytics
 from app.core.cache.redis_service import get_redis_service
 
 from app.core.datastore.redis_connector import redis_connector
@@ -11,8 +12,18 @@ from app.core.datastore.redis_connector import redis_connector
 
 import logging
 
-from app.config.database import init_db
+from app.config.database import init_db, async_engine, pool_telemetry
+from app.config.logging_config import configure_logging, shutdown_logging
 from app.core.event.consumer.auth_event_consumer import AuthEventConsumer
+from app.core.event.producer.outbox_relay import OutboxRelay
+from app.core.jobs.analytics_reconciler import AnalyticsReconciler, ANALYTICS_RECONCILE_INTERVAL
+from app.core.jobs.blob_sweeper import BlobSweeper, BLOB_GC_INTERVAL
+from app.middleware.admission_middleware import upload_admission
+from app.middleware.tracing_middleware import TracingMiddleware
+
+# Logging asíncrono a través de una cola, configurado antes de crear la aplicación
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
@@ -23,15 +34,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id"],
 )
 
+# Traza por petición con muestreo; se añade al final para envolver al resto de middlewares
+app.add_middleware(TracingMiddleware)
+
 app.include_router(
     profiler.router
 )
-
-# Inicializa la base de datos
-init_db()
-
+app.include_router(
+    analytics.router
+)
 
 # Health check endpoint
 @app.get("/health")
@@ -43,26 +57,51 @@ async def health_check():
     }
 
 
+# Métricas de admisión de cargas de CV
+@app.get("/metrics/admission")
+async def admission_metrics():
+    return upload_admission.snapshot()
+
+
+# Métricas del pool de conexiones a la base de datos
+@app.get("/metrics/db")
+async def db_metrics():
+    return pool_telemetry.snapshot()
+
+
 @app.on_event("startup")
 async def startup_event():
     """
     Evento de inicio de la aplicación.
+    - Inicializa la base de datos.
     - Inicializa la conexión a Redis.
     - Crea la tarea asíncrona para el consumidor de eventos.
+    - Crea la tarea asíncrona del relay de eventos de perfil.
+    - Crea la tarea de reconciliación periódica de analítica.
+    - Crea la tarea de limpieza de blobs huérfanos.
     """
+    # Inicializa la base de datos
+    await init_db()
+
     # Inicializar el pool de conexiones Redis
     await redis_connector.init_redis_pool()
 
     # Instanciar los consumidores de eventos
     auth_consumer = AuthEventConsumer(await get_redis_service())
     #job_consumer = JobEventConsumer()
+    outbox_relay = OutboxRelay()
 
     # Crear las tareas asíncronas para que los consumidores empiecen a escuchar
     # y almacenarlas en el estado de la aplicación
     app.state.consumer_tasks = [
         asyncio.create_task(auth_consumer.start()),
+        asyncio.create_task(outbox_relay.start()),
         #asyncio.create_task(job_consumer.start())
     ]
+    if ANALYTICS_RECONCILE_INTERVAL > 0:
+        app.state.consumer_tasks.append(asyncio.create_task(AnalyticsReconciler().start()))
+    if BLOB_GC_INTERVAL > 0:
+        app.state.consumer_tasks.append(asyncio.create_task(BlobSweeper().start()))
 
     # Agregar manejador de errores para las tareas
     for task in app.state.consumer_tasks:
@@ -79,7 +118,7 @@ def handle_consumer_task_result(task):
     except asyncio.CancelledError:
         pass  # La tarea fue cancelada normalmente durante el apagado
     except Exception as e:
-        logging.error(f"Consumer task failed with error: {str(e)}")
+        logger.error(f"Consumer task failed with error: {str(e)}")
 
 
 @app.on_event("shutdown")
@@ -88,6 +127,9 @@ async def shutdown_event():
     Evento de cierre de la aplicación.
     - Cancela las tareas de los consumidores.
     - Cierra la conexión al pool de Redis.
+    - Cierra el pool de conexiones a la base de datos.
+    - Detiene el pool de procesos de extracción de PDF.
+    - Vacía la cola de logs.
     """
     # Cancelar todas las tareas de los consumidores
     if hasattr(app.state, 'consumer_tasks'):
@@ -100,6 +142,12 @@ async def shutdown_event():
     if redis_connector.pool:
         await redis_connector.pool.disconnect()
 
+    await async_engine.dispose()
+
+    await asyncio.to_thread(shutdown_pdf_pool)
+
+    shutdown_logging()
+
 
 if __name__ == "__main__":
     import uvicorn
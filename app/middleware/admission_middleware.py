@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+
+from fastapi import Depends, HTTPException
+
+from app.core.cache.rate_limiter import get_rate_limiter
+from app.middleware.auth_middleware import require_auth
+
+logger = logging.getLogger(__name__)
+
+# Límites de admisión para la ingesta de CVs (por proceso)
+UPLOAD_MAX_IN_FLIGHT = int(os.getenv("UPLOAD_MAX_IN_FLIGHT", 8))
+UPLOAD_MAX_QUEUE = int(os.getenv("UPLOAD_MAX_QUEUE", 16))
+UPLOAD_QUEUE_TIMEOUT = float(os.getenv("UPLOAD_QUEUE_TIMEOUT", 10))
+
+
+@dataclass
+class AdmissionMetrics:
+    admitted: int = 0
+    rejected_rate_limited: int = 0
+    rejected_queue_full: int = 0
+    rejected_queue_timeout: int = 0
+    max_queue_depth: int = 0
+
+
+class AdmissionController:
+    """
+    Limita las cargas simultáneas: hasta `max_in_flight` en proceso y
+    `max_queue` esperando. Cuando la cola está llena se responde 429 de
+    inmediato en lugar de acumular peticiones que acabarían en timeout.
+    """
+
+    def __init__(self, max_in_flight: int = UPLOAD_MAX_IN_FLIGHT,
+                 max_queue: int = UPLOAD_MAX_QUEUE,
+                 queue_timeout: float = UPLOAD_QUEUE_TIMEOUT):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self.metrics = AdmissionMetrics()
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._avg_service_time = 1.0  # Media móvil del tiempo de proceso, en segundos
+
+    def retry_after(self) -> int:
+        """Estimación del tiempo hasta que se libere capacidad."""
+        waves = (self.queued + 1) / self.max_in_flight
+        return max(1, math.ceil(self._avg_service_time * waves))
+
+    def _reject(self, reason: str):
+        setattr(self.metrics, f"rejected_{reason}", getattr(self.metrics, f"rejected_{reason}") + 1)
+        logger.warning(f"Carga rechazada ({reason}): en proceso={self.in_flight}, en cola={self.queued}")
+        raise HTTPException(
+            status_code=429,
+            detail="Servicio saturado, reintenta más tarde",
+            headers={"Retry-After": str(self.retry_after())}
+        )
+
+    def check_capacity(self):
+        """Rechaza de inmediato si no hay hueco ni en proceso ni en la cola."""
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            self._reject("queue_full")
+
+    @asynccontextmanager
+    async def slot(self):
+        """Reserva un hueco de proceso, esperando en la cola acotada si es necesario."""
+        if self._semaphore.locked():
+            self.check_capacity()
+            self.queued += 1
+            self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.queued)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject("queue_timeout")
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        self.metrics.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * (time.monotonic() - started)
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            **asdict(self.metrics),
+        }
+
+
+# Instancia global del controlador de admisión
+upload_admission = AdmissionController()
+
+
+async def enforce_rate_limit(user: dict):
+    """Aplica el token bucket del usuario; responde 429 con Retry-After si está agotado."""
+    limiter = await get_rate_limiter()
+    allowed, retry_after = await limiter.acquire(user.get("userId"))
+    if not allowed:
+        upload_admission.metrics.rejected_rate_limited += 1
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiadas cargas, reintenta más tarde",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+# Funciones de ayuda para las rutas de ingesta
+def require_upload_rate_limit():
+    async def dependency(user: dict = Depends(require_auth())):
+        await enforce_rate_limit(user)
+        return user
+    return dependency
+
+
+def require_upload_admission():
+    async def dependency(user: dict = Depends(require_upload_rate_limit())):
+        async with upload_admission.slot():
+            yield user
+    return dependency
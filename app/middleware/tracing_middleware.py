@@ -0,0 +1,38 @@
+from app.core.tracing.tracer import start_trace, end_trace
+
+TRACE_HEADER = b"x-trace-id"
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre una traza por petición HTTP, respeta la cabecera
+    X-Trace-Id entrante y la devuelve en la respuesta. Se implementa sobre
+    ASGI puro para no envolver las respuestas en streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or []).get(TRACE_HEADER)
+        trace, token = start_trace(
+            f"{scope['method']} {scope['path']}",
+            trace_id=incoming.decode("latin-1")[:64] if incoming else None
+        )
+        status = 500
+
+        async def send_with_trace_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (TRACE_HEADER, trace.trace_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            end_trace(trace, token, method=scope["method"], path=scope["path"], status=status)
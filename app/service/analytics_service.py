@@ -0,0 +1,348 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.model.analytics import SkillCount, SkillPairCount, LanguageCount, RoleCount
+from app.core.schemas.profile import ProfileCreate
+
+# Habilidades por perfil consideradas para la co-ocurrencia (las primeras en orden de clave);
+# acota los pares por perfil a N * (N - 1)
+ANALYTICS_MAX_PAIR_SKILLS = int(os.getenv("ANALYTICS_MAX_PAIR_SKILLS", 30))
+
+# Identificador del advisory lock de la reconciliación
+RECONCILE_LOCK_ID = 7_301_038
+
+# Filas de deriva aplicadas por transacción durante la reconciliación
+RECONCILE_BATCH_SIZE = 5000
+
+
+def _clean(value) -> str:
+    """Colapsa los espacios; debe coincidir con la normalización en SQL (_CLEAN)."""
+    return " ".join(str(value).split()) if value else ""
+
+
+@dataclass
+class ProfileFacts:
+    """Contribución de un perfil a los agregados, indexada por clave normalizada."""
+    skills: Dict[str, str] = field(default_factory=dict)  # clave -> etiqueta
+    languages: Dict[Tuple[str, str], str] = field(default_factory=dict)  # (idioma, nivel) -> etiqueta
+    roles: Dict[str, List] = field(default_factory=dict)  # clave -> [etiqueta, actuales, pasadas]
+
+    @classmethod
+    def build(cls,
+              skills: Optional[Iterable[str]],
+              languages: Optional[Iterable[dict]],
+              roles: Optional[Iterable[Tuple[Optional[str], Optional[bool]]]]
+              ) -> "ProfileFacts":
+        facts = cls()
+        for skill in skills or []:
+            label = _clean(skill)
+            if label:
+                facts.skills.setdefault(label.lower(), label)
+        for language in languages or []:
+            label = _clean(language.get("language"))
+            if label:
+                key = (label.lower(), _clean(language.get("proficiency")).lower())
+                facts.languages.setdefault(key, label)
+        for position, current in roles or []:
+            label = _clean(position)
+            if label:
+                counts = facts.roles.setdefault(label.lower(), [label, 0, 0])
+                counts[1 if current else 2] += 1
+        return facts
+
+    @classmethod
+    def from_profile_create(cls, data: ProfileCreate) -> "ProfileFacts":
+        return cls.build(
+            data.skills,
+            [language.dict() for language in data.languages or []],
+            [(exp.position, exp.current) for exp in data.experiences or []],
+        )
+
+    def skill_pairs(self) -> Set[Tuple[str, str]]:
+        keys = sorted(self.skills)[:ANALYTICS_MAX_PAIR_SKILLS]
+        return {(a, b) for a in keys for b in keys if a != b}
+
+
+def _presence_delta(old, new) -> Dict:
+    """+1 para las claves nuevas y -1 para las que desaparecen."""
+    return {key: (key in new) - (key in old) for key in set(old) ^ set(new)}
+
+
+def _increment(model, rows: List[dict], counters: List[str]):
+    """Upsert que suma los contadores de las filas a los existentes."""
+    table = model.__table__
+    stmt = pg_insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key],
+        set_={counter: table.c[counter] + stmt.excluded[counter] for counter in counters},
+    )
+
+
+async def apply_analytics_delta(db: AsyncSession, old: ProfileFacts, new: ProfileFacts):
+    """
+    Aplica a los agregados la diferencia entre la contribución anterior y la
+    nueva de un perfil, dentro de la transacción de la escritura. Las filas se
+    actualizan en orden de clave para que las transacciones concurrentes tomen
+    los bloqueos en el mismo orden.
+    """
+    skills = _presence_delta(old.skills, new.skills)
+    if skills:
+        labels = {**old.skills, **new.skills}
+        await db.execute(_increment(SkillCount, [
+            {"skill": key, "label": labels[key], "profile_count": delta}
+            for key, delta in sorted(skills.items())
+        ], ["profile_count"]))
+
+    pairs = _presence_delta(old.skill_pairs(), new.skill_pairs())
+    if pairs:
+        await db.execute(_increment(SkillPairCount, [
+            {"skill": skill, "other_skill": other, "profile_count": delta}
+            for (skill, other), delta in sorted(pairs.items())
+        ], ["profile_count"]))
+
+    languages = _presence_delta(old.languages, new.languages)
+    if languages:
+        labels = {**old.languages, **new.languages}
+        await db.execute(_increment(LanguageCount, [
+            {"language": language, "proficiency": proficiency, "label": labels[(language, proficiency)],
+             "profile_count": delta}
+            for (language, proficiency), delta in sorted(languages.items())
+        ], ["profile_count"]))
+
+    roles = []
+    for key in sorted(old.roles.keys() | new.roles.keys()):
+        label, old_current, old_past = old.roles.get(key, [None, 0, 0])
+        label, new_current, new_past = new.roles.get(key, [label, 0, 0])
+        if (new_current, new_past) != (old_current, old_past):
+            roles.append({"position": key, "label": label,
+                          "current_count": new_current - old_current, "past_count": new_past - old_past})
+    if roles:
+        await db.execute(_increment(RoleCount, roles, ["current_count", "past_count"]))
+
+
+# --- Agregados por conjuntos en SQL (importación masiva y reconciliación) ---
+
+_CLEAN = "btrim(regexp_replace({}, '\\s+', ' ', 'g'))"
+
+_SKILL_FACTS = f"""
+    SELECT p.id AS profile_id, lower(c.label) AS skill, min(c.label) AS label
+    FROM profiles p {{scope}}
+    CROSS JOIN LATERAL unnest(p.skills) AS s(raw)
+    CROSS JOIN LATERAL (SELECT {_CLEAN.format("s.raw")} AS label) c
+    WHERE c.label <> ''
+    GROUP BY p.id, lower(c.label)
+"""
+
+
+@dataclass(frozen=True)
+class _Aggregate:
+    model: type
+    keys: Tuple[str, ...]
+    labels: Tuple[str, ...]
+    counters: Tuple[str, ...]
+    query: str  # Selecciona claves, etiquetas y contadores para los perfiles de {scope}
+
+    @property
+    def table(self) -> str:
+        return self.model.__tablename__
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return self.keys + self.labels + self.counters
+
+
+AGGREGATES = [
+    _Aggregate(
+        model=SkillCount,
+        keys=("skill",), labels=("label",), counters=("profile_count",),
+        query=f"""
+            SELECT skill, min(label) AS label, count(*) AS profile_count
+            FROM ({_SKILL_FACTS}) f
+            GROUP BY skill
+        """,
+    ),
+    _Aggregate(
+        model=SkillPairCount,
+        keys=("skill", "other_skill"), labels=(), counters=("profile_count",),
+        query=f"""
+            WITH ranked AS (
+                SELECT profile_id, skill,
+                       row_number() OVER (PARTITION BY profile_id ORDER BY skill COLLATE "C") AS rank
+                FROM ({_SKILL_FACTS}) f
+            )
+            SELECT a.skill, b.skill AS other_skill, count(*) AS profile_count
+            FROM ranked a JOIN ranked b ON b.profile_id = a.profile_id AND b.skill <> a.skill
+            WHERE a.rank <= {ANALYTICS_MAX_PAIR_SKILLS} AND b.rank <= {ANALYTICS_MAX_PAIR_SKILLS}
+            GROUP BY a.skill, b.skill
+        """,
+    ),
+    _Aggregate(
+        model=LanguageCount,
+        keys=("language", "proficiency"), labels=("label",), counters=("profile_count",),
+        query=f"""
+            SELECT language, proficiency, min(label) AS label, count(*) AS profile_count
+            FROM (
+                SELECT p.id, lower(c.label) AS language, c.proficiency, min(c.label) AS label
+                FROM profiles p {{scope}}
+                CROSS JOIN LATERAL unnest(p.languages) AS l(value)
+                CROSS JOIN LATERAL (
+                    SELECT {_CLEAN.format("l.value->>'language'")} AS label,
+                           lower({_CLEAN.format("coalesce(l.value->>'proficiency', '')")}) AS proficiency
+                ) c
+                WHERE c.label <> ''
+                GROUP BY p.id, lower(c.label), c.proficiency
+            ) f
+            GROUP BY language, proficiency
+        """,
+    ),
+    _Aggregate(
+        model=RoleCount,
+        keys=("position",), labels=("label",), counters=("current_count", "past_count"),
+        query=f"""
+            SELECT lower(c.label) AS position, min(c.label) AS label,
+                   count(*) FILTER (WHERE coalesce(w.current, false)) AS current_count,
+                   count(*) FILTER (WHERE NOT coalesce(w.current, false)) AS past_count
+            FROM work_experiences w
+            JOIN profiles p ON p.id = w.profile_id {{scope}}
+            CROSS JOIN LATERAL (SELECT {_CLEAN.format("w.position")} AS label) c
+            WHERE c.label <> ''
+            GROUP BY lower(c.label)
+        """,
+    ),
+]
+
+
+def analytics_increment_sql(scope: str, sign: int) -> List[str]:
+    """
+    Sentencias que suman (sign=1) o restan (sign=-1) a los agregados la
+    contribución de los perfiles seleccionados por `scope`, un JOIN sobre `p`.
+    """
+    statements = []
+    for aggregate in AGGREGATES:
+        columns = ", ".join(aggregate.columns)
+        selected = ", ".join(aggregate.keys + aggregate.labels
+                             + tuple(f"{sign} * {counter}" for counter in aggregate.counters))
+        updates = ", ".join(f"{counter} = t.{counter} + EXCLUDED.{counter}" for counter in aggregate.counters)
+        statements.append(f"""
+            INSERT INTO {aggregate.table} AS t ({columns})
+            SELECT {selected} FROM ({aggregate.query.format(scope=scope)}) q
+            ORDER BY {", ".join(aggregate.keys)}
+            ON CONFLICT ({", ".join(aggregate.keys)}) DO UPDATE SET {updates}
+        """)
+    return statements
+
+
+def _drift_sql(aggregate: _Aggregate) -> str:
+    """Diferencia, por clave, entre el recálculo completo y los contadores actuales."""
+    keys = ", ".join(f"coalesce(e.{key}, t.{key}) AS {key}" for key in aggregate.keys)
+    labels = ", ".join(f"coalesce(e.{label}, t.{label}) AS {label}" for label in aggregate.labels)
+    deltas = ", ".join(f"coalesce(e.{counter}, 0) - coalesce(t.{counter}, 0) AS {counter}"
+                       for counter in aggregate.counters)
+    matches = " AND ".join(f"e.{key} = t.{key}" for key in aggregate.keys)
+    drift = " OR ".join(f"coalesce(e.{counter}, 0) <> coalesce(t.{counter}, 0)" for counter in aggregate.counters)
+    return f"""
+        WITH expected AS ({aggregate.query.format(scope="")})
+        SELECT {", ".join(filter(None, [keys, labels, deltas]))}
+        FROM expected e FULL OUTER JOIN {aggregate.table} t ON {matches}
+        WHERE {drift}
+        ORDER BY {", ".join(aggregate.keys)}
+    """
+
+
+def _prune_sql(aggregate: _Aggregate) -> str:
+    zero = " AND ".join(f"{counter} = 0" for counter in aggregate.counters)
+    return f"DELETE FROM {aggregate.table} WHERE {zero}"
+
+
+async def reconcile_analytics(session_factory: async_sessionmaker,
+                              batch_size: int = RECONCILE_BATCH_SIZE
+                              ) -> Optional[Dict[str, int]]:
+    """
+    Recalcula los agregados desde los perfiles y corrige la deriva sin bloquear
+    las escrituras. El recálculo y la lectura de los contadores se hacen en una
+    misma instantánea (REPEATABLE READ); como cada escritura actualiza perfil y
+    agregados en una transacción, la diferencia en esa instantánea es la deriva
+    real. Se aplica como incrementos en transacciones cortas, que conmutan con
+    los de las escrituras concurrentes. Retorna las filas corregidas por tabla,
+    o None si otra instancia ya está reconciliando.
+    """
+    async with session_factory() as snapshot_db, session_factory() as apply_db:
+        await snapshot_db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        if not await snapshot_db.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": RECONCILE_LOCK_ID}):
+            return None
+
+        report = {}
+        for aggregate in AGGREGATES:
+            corrected = 0
+            result = await snapshot_db.stream(text(_drift_sql(aggregate)))
+            async for rows in result.mappings().partitions(batch_size):
+                await apply_db.execute(_increment(aggregate.model, [dict(row) for row in rows],
+                                                  list(aggregate.counters)))
+                await apply_db.commit()
+                corrected += len(rows)
+            await apply_db.execute(text(_prune_sql(aggregate)))
+            await apply_db.commit()
+            report[aggregate.table] = corrected
+        await snapshot_db.commit()
+    return report
+
+
+# --- Consultas para los paneles: recorren índices ordenados, coste proporcional al resultado ---
+
+async def get_top_skills(db: AsyncSession, limit: int) -> List[dict]:
+    result = await db.execute(
+        select(SkillCount)
+        .where(SkillCount.profile_count > 0)
+        .order_by(SkillCount.profile_count.desc())
+        .limit(limit)
+    )
+    return [
+        {"skill": row.label, "profile_count": row.profile_count}
+        for row in result.scalars()
+    ]
+
+
+async def get_skill_cooccurrence(db: AsyncSession, skill: str, limit: int) -> List[dict]:
+    result = await db.execute(
+        select(SkillPairCount.other_skill, SkillPairCount.profile_count, SkillCount.label)
+        .outerjoin(SkillCount, SkillCount.skill == SkillPairCount.other_skill)
+        .where(SkillPairCount.skill == _clean(skill).lower(), SkillPairCount.profile_count > 0)
+        .order_by(SkillPairCount.profile_count.desc())
+        .limit(limit)
+    )
+    return [
+        {"skill": label or other_skill, "profile_count": profile_count}
+        for other_skill, profile_count, label in result
+    ]
+
+
+async def get_language_distribution(db: AsyncSession, language: Optional[str] = None) -> List[dict]:
+    query = select(LanguageCount).where(LanguageCount.profile_count > 0)
+    if language:
+        query = query.where(LanguageCount.language == _clean(language).lower())
+    result = await db.execute(query.order_by(LanguageCount.language, LanguageCount.profile_count.desc()))
+
+    distribution = {}
+    for row in result.scalars():
+        entry = distribution.setdefault(row.language, {"language": row.label, "proficiency": []})
+        entry["proficiency"].append({"level": row.proficiency or None, "profile_count": row.profile_count})
+    return list(distribution.values())
+
+
+async def get_top_roles(db: AsyncSession, limit: int) -> List[dict]:
+    total = RoleCount.current_count + RoleCount.past_count
+    result = await db.execute(
+        select(RoleCount)
+        .where(total > 0)
+        .order_by(total.desc())
+        .limit(limit)
+    )
+    return [
+        {"position": row.label, "current": row.current_count, "past": row.past_count}
+        for row in result.scalars()
+    ]
@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.model.profile import Profile, WorkExperience, Education
+from app.service.profiler_service import serialize_experience, serialize_education
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional
+    pa = None
+    pq = None
+
+PARQUET_AVAILABLE = pa is not None
+
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Perfiles por lote leídos del cursor del servidor
+EXPORT_BATCH_SIZE = 1000
+
+# Columnas planas; las listas y objetos se exportan como JSON en CSV y Parquet
+EXPORT_COLUMNS = [
+    "id", "user_id", "first_name", "last_name", "headline", "about", "location",
+    "contact_info", "skills", "languages", "experiences", "education", "created_at", "updated_at",
+]
+NESTED_COLUMNS = {"location", "contact_info", "skills", "languages", "experiences", "education"}
+
+
+async def iter_profile_batches(db: AsyncSession,
+                               updated_since: Optional[datetime] = None,
+                               updated_until: Optional[datetime] = None,
+                               batch_size: int = EXPORT_BATCH_SIZE
+                               ) -> AsyncIterator[List[dict]]:
+    """
+    Recorre los perfiles con un cursor del lado del servidor y genera lotes
+    de registros con sus experiencias y educación, con memoria constante.
+    """
+    query = select(Profile).order_by(Profile.id).execution_options(yield_per=batch_size)
+    if updated_since:
+        query = query.where(Profile.updated_at >= updated_since)
+    if updated_until:
+        query = query.where(Profile.updated_at < updated_until)
+
+    result = await db.stream(query)
+    async for profiles in result.scalars().partitions():
+        ids = [profile.id for profile in profiles]
+        experiences = await _load_children(db, WorkExperience, ids)
+        education = await _load_children(db, Education, ids)
+
+        yield [
+            {
+                "id": str(profile.id),
+                "user_id": profile.user_id,
+                "first_name": profile.first_name,
+                "last_name": profile.last_name,
+                "headline": profile.headline,
+                "about": profile.about,
+                "location": profile.location,
+                "contact_info": profile.contact_info,
+                "skills": profile.skills,
+                "languages": profile.languages,
+                "experiences": [serialize_experience(exp) for exp in experiences[profile.id]],
+                "education": [serialize_education(edu) for edu in education[profile.id]],
+                "created_at": profile.created_at.isoformat() if profile.created_at else None,
+                "updated_at": profile.updated_at.isoformat() if profile.updated_at else None,
+            }
+            for profile in profiles
+        ]
+        # Evita que el identity map crezca con cada lote
+        db.expunge_all()
+
+
+async def _load_children(db: AsyncSession, model, profile_ids: list) -> Dict:
+    rows = await db.execute(select(model).where(model.profile_id.in_(profile_ids)))
+    grouped = defaultdict(list)
+    for child in rows.scalars():
+        grouped[child.profile_id].append(child)
+    return grouped
+
+
+def _flatten(record: dict) -> dict:
+    return {
+        column: json.dumps(record[column], ensure_ascii=False) if column in NESTED_COLUMNS else record[column]
+        for column in EXPORT_COLUMNS
+    }
+
+
+class _ChunkSink(io.RawIOBase):
+    """Archivo en memoria que se vacía tras cada escritura de Parquet."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def export_profiles(db: AsyncSession,
+                          fmt: str,
+                          updated_since: Optional[datetime] = None,
+                          updated_until: Optional[datetime] = None,
+                          batch_size: int = EXPORT_BATCH_SIZE
+                          ) -> AsyncIterator[bytes]:
+    """Genera la exportación en NDJSON, CSV o Parquet, un lote cada vez."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación desconocido: {fmt}")
+    if fmt == "parquet" and pa is None:
+        raise ValueError("La exportación a Parquet requiere el paquete 'pyarrow'")
+
+    batches = iter_profile_batches(db, updated_since, updated_until, batch_size)
+
+    if fmt == "ndjson":
+        async for batch in batches:
+            yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch).encode("utf-8")
+
+    elif fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        async for batch in batches:
+            writer.writerows(_flatten(record) for record in batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    else:
+        schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        async for batch in batches:
+            rows = [_flatten(record) for record in batch]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
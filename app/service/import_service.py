@@ -0,0 +1,320 @@
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.model.profile import Profile, WorkExperience, Education
+from app.core.schemas.profile import ProfileCreate
+from app.service.analytics_service import analytics_increment_sql
+
+# Registros validados y cargados por transacción
+IMPORT_BATCH_SIZE = 1000
+
+# Máximo de errores detallados en el informe
+MAX_REPORTED_ERRORS = 1000
+
+# Tablas de staging por conexión; se vacían al confirmar cada lote
+STAGING_DDL = [
+    """
+    CREATE TEMP TABLE IF NOT EXISTS stage_profiles (
+        id uuid, user_id varchar, first_name varchar(100), last_name varchar(100),
+        headline varchar(200), about text, location jsonb, contact_info jsonb,
+        skills varchar[], languages jsonb[]
+    ) ON COMMIT DELETE ROWS
+    """,
+    """
+    CREATE TEMP TABLE IF NOT EXISTS stage_work_experiences (
+        id uuid, user_id varchar, company_name varchar(200), position varchar(200),
+        location varchar(200), start_date date, end_date date, current boolean, description text
+    ) ON COMMIT DELETE ROWS
+    """,
+    """
+    CREATE TEMP TABLE IF NOT EXISTS stage_education (
+        id uuid, user_id varchar, institution_name varchar(200), degree varchar(200),
+        field_of_study varchar(200), start_date date, end_date date, description text
+    ) ON COMMIT DELETE ROWS
+    """,
+]
+
+PROFILE_COLUMNS = ["id", "user_id", "first_name", "last_name", "headline", "about",
+                   "location", "contact_info", "skills", "languages"]
+EXPERIENCE_COLUMNS = ["id", "user_id", "company_name", "position", "location",
+                      "start_date", "end_date", "current", "description"]
+EDUCATION_COLUMNS = ["id", "user_id", "institution_name", "degree", "field_of_study",
+                     "start_date", "end_date", "description"]
+
+
+def _column_limits(model, columns: List[str]) -> dict:
+    """Longitud máxima de las columnas varchar, para validar antes del COPY."""
+    return {
+        column: model.__table__.c[column].type.length
+        for column in columns
+        if column in model.__table__.c and getattr(model.__table__.c[column].type, "length", None)
+    }
+
+
+PROFILE_LIMITS = _column_limits(Profile, PROFILE_COLUMNS)
+EXPERIENCE_LIMITS = _column_limits(WorkExperience, EXPERIENCE_COLUMNS)
+EDUCATION_LIMITS = _column_limits(Education, EDUCATION_COLUMNS)
+
+# Perfiles del lote en curso, para acotar los agregados de analítica
+STAGED_PROFILES_SCOPE = "JOIN stage_profiles st ON st.user_id = p.user_id"
+
+# Upsert por conjuntos desde staging. Los perfiles existentes se bloquean primero,
+# como en la carga individual, y sus contribuciones a los agregados se restan antes
+# de reemplazarlos y se suman de nuevo al final
+UPSERT_SQL = [
+    """
+    SELECT p.id FROM profiles p JOIN stage_profiles s ON s.user_id = p.user_id
+    ORDER BY p.id FOR UPDATE OF p
+    """,
+    *analytics_increment_sql(STAGED_PROFILES_SCOPE, -1),
+    """
+    INSERT INTO profiles (id, user_id, first_name, last_name, headline, about, location,
+                          contact_info, skills, languages, created_at, updated_at)
+    SELECT id, user_id, first_name, last_name, headline, about, location,
+           contact_info, skills, languages, now() at time zone 'utc', now() at time zone 'utc'
+    FROM stage_profiles
+    ON CONFLICT (user_id) DO UPDATE SET
+        first_name = EXCLUDED.first_name,
+        last_name = EXCLUDED.last_name,
+        headline = EXCLUDED.headline,
+        about = EXCLUDED.about,
+        location = EXCLUDED.location,
+        contact_info = EXCLUDED.contact_info,
+        skills = EXCLUDED.skills,
+        languages = EXCLUDED.languages,
+        updated_at = EXCLUDED.updated_at
+    """,
+    """
+    DELETE FROM work_experiences w
+    USING profiles p JOIN stage_profiles s ON s.user_id = p.user_id
+    WHERE w.profile_id = p.id
+    """,
+    """
+    DELETE FROM education e
+    USING profiles p JOIN stage_profiles s ON s.user_id = p.user_id
+    WHERE e.profile_id = p.id
+    """,
+    """
+    INSERT INTO work_experiences (id, profile_id, company_name, position, location,
+                                  start_date, end_date, current, description, created_at)
+    SELECT s.id, p.id, s.company_name, s.position, s.location,
+           s.start_date, s.end_date, s.current, s.description, now() at time zone 'utc'
+    FROM stage_work_experiences s JOIN profiles p ON p.user_id = s.user_id
+    """,
+    """
+    INSERT INTO education (id, profile_id, institution_name, degree, field_of_study,
+                           start_date, end_date, description, created_at)
+    SELECT s.id, p.id, s.institution_name, s.degree, s.field_of_study,
+           s.start_date, s.end_date, s.description, now() at time zone 'utc'
+    FROM stage_education s JOIN profiles p ON p.user_id = s.user_id
+    """,
+    *analytics_increment_sql(STAGED_PROFILES_SCOPE, 1),
+    """
+    INSERT INTO profile_outbox (event_id, event_type, aggregate_id, event_key, payload, created_at, attempts)
+    SELECT e.event_id, 'PROFILE_CHANGED', e.profile_id, e.user_id,
+           jsonb_build_object('eventId', e.event_id, 'type', 'PROFILE_CHANGED', 'profileId', e.profile_id,
+                              'userId', e.user_id, 'occurredAt', e.created_at),
+           e.created_at, 0
+    FROM (
+        SELECT gen_random_uuid() AS event_id, p.id AS profile_id, p.user_id,
+               now() at time zone 'utc' AS created_at
+        FROM profiles p JOIN stage_profiles s ON s.user_id = p.user_id
+    ) e
+    """,
+]
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    imported: int = 0
+    failed: int = 0
+    rows: int = 0
+    elapsed_seconds: float = 0.0
+    errors: List[dict] = field(default_factory=list)
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def add_error(self, line: int, user_id: Optional[str], error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "user_id": user_id, "error": error})
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "imported": self.imported,
+            "failed": self.failed,
+            "rows": self.rows,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "errors": self.errors,
+        }
+
+
+def _length_errors(data: ProfileCreate) -> List[str]:
+    """Campos que exceden la longitud de su columna y harían fallar el lote completo."""
+    errors = []
+
+    def check(prefix: str, record, limits: dict):
+        for column, limit in limits.items():
+            value = getattr(record, column, None)
+            if isinstance(value, str) and len(value) > limit:
+                errors.append(f"{prefix}{column} excede {limit} caracteres")
+
+    check("", data, PROFILE_LIMITS)
+    for index, exp in enumerate(data.experiences):
+        check(f"experiences[{index}].", exp, EXPERIENCE_LIMITS)
+    for index, edu in enumerate(data.education):
+        check(f"education[{index}].", edu, EDUCATION_LIMITS)
+    return errors
+
+
+def _validate_line(line_number: int, line: Union[str, bytes],
+                   report: ImportReport) -> Optional[Tuple[str, ProfileCreate]]:
+    """Valida una línea JSON con `user_id` y los campos de ProfileCreate."""
+    try:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        payload = json.loads(line)
+    except UnicodeDecodeError as e:
+        report.add_error(line_number, None, f"Codificación inválida (se espera UTF-8): {e}")
+        return None
+    except json.JSONDecodeError as e:
+        report.add_error(line_number, None, f"JSON inválido: {e}")
+        return None
+
+    user_id = payload.pop("user_id", None) if isinstance(payload, dict) else None
+    if not user_id:
+        report.add_error(line_number, None, "Falta user_id")
+        return None
+    try:
+        data = ProfileCreate.model_validate(payload)
+    except ValidationError as e:
+        report.add_error(line_number, user_id, str(e))
+        return None
+
+    errors = _length_errors(data)
+    if errors:
+        report.add_error(line_number, user_id, "; ".join(errors))
+        return None
+    return user_id, data
+
+
+def _staging_records(batch: List[Tuple[str, ProfileCreate]]):
+    profiles, experiences, education = [], [], []
+    for user_id, data in batch:
+        profiles.append((
+            uuid.uuid4(), user_id, data.first_name, data.last_name, data.headline, data.about,
+            json.dumps(data.location) if data.location is not None else None,
+            data.contact_info.model_dump_json() if data.contact_info else None,
+            data.skills,
+            [lang.model_dump_json() for lang in data.languages] if data.languages else None,
+        ))
+        for exp in data.experiences:
+            experiences.append((
+                uuid.uuid4(), user_id, exp.company_name, exp.position, exp.location,
+                exp.start_date, exp.end_date, exp.current, exp.description,
+            ))
+        for edu in data.education:
+            education.append((
+                uuid.uuid4(), user_id, edu.institution_name, edu.degree, edu.field_of_study,
+                edu.start_date, edu.end_date, edu.description,
+            ))
+    return profiles, experiences, education
+
+
+async def _load_batch(db: AsyncSession, batch: List[Tuple[str, ProfileCreate]]) -> int:
+    """Carga un lote con COPY a staging y upsert por conjuntos. Retorna las filas cargadas."""
+    profiles, experiences, education = _staging_records(batch)
+
+    # El DDL inicia la transacción de la sesión; COPY se ejecuta dentro de ella
+    for ddl in STAGING_DDL:
+        await db.execute(text(ddl))
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    pg = raw.driver_connection
+
+    await pg.copy_records_to_table("stage_profiles", records=profiles, columns=PROFILE_COLUMNS)
+    if experiences:
+        await pg.copy_records_to_table("stage_work_experiences", records=experiences, columns=EXPERIENCE_COLUMNS)
+    if education:
+        await pg.copy_records_to_table("stage_education", records=education, columns=EDUCATION_COLUMNS)
+
+    for statement in UPSERT_SQL:
+        await db.execute(text(statement))
+    await db.commit()
+    return len(profiles) + len(experiences) + len(education)
+
+
+async def import_profiles(db: AsyncSession,
+                          lines: Union[Iterable[Union[str, bytes]], AsyncIterator[Union[str, bytes]]],
+                          batch_size: int = IMPORT_BATCH_SIZE
+                          ) -> ImportReport:
+    """
+    Importa perfiles ya estructurados desde JSON lines (`user_id` + ProfileCreate).
+    Los registros inválidos se informan por línea sin detener la importación.
+    Si un lote falla en la base de datos se divide en mitades hasta aislar los
+    registros que fallan, y el resto se carga igualmente.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    pending = {}  # user_id -> (línea, perfil); el último registro de un usuario gana
+
+    async def load(records: List[Tuple[int, str, ProfileCreate]]):
+        try:
+            report.rows += await _load_batch(db, [(user_id, data) for _, user_id, data in records])
+            report.imported += len(records)
+        except Exception as e:
+            await db.rollback()
+            if len(records) == 1:
+                line_number, user_id, _ = records[0]
+                report.add_error(line_number, user_id, f"Error al cargar el registro: {e}")
+                return
+            middle = len(records) // 2
+            await load(records[:middle])
+            await load(records[middle:])
+
+    async def flush():
+        await load([(line_number, user_id, data) for user_id, (line_number, data) in pending.items()])
+        pending.clear()
+
+    async def iterate():
+        if hasattr(lines, "__aiter__"):
+            async for line in lines:
+                yield line
+        else:
+            for line in lines:
+                yield line
+
+    line_number = 0
+    async for line in iterate():
+        line_number += 1
+        if not line.strip():
+            continue
+        report.total += 1
+        validated = _validate_line(line_number, line, report)
+        if validated is None:
+            continue
+
+        user_id, data = validated
+        if user_id in pending:
+            report.add_error(pending[user_id][0], user_id, "user_id duplicado; se conserva el último registro")
+        pending[user_id] = (line_number, data)
+        if len(pending) >= batch_size:
+            await flush()
+
+    if pending:
+        await flush()
+
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
@@ -1,10 +1,21 @@
+import asyncio
+import time
 import uuid
 from datetime import datetime, date
+from typing import List, Optional, Set
+from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from app.core.model.outbox import OutboxEvent
 from app.core.model.profile import Profile, Document, WorkExperience, Education
 from app.core.schemas.profile import ProfileCreate
+from app.core.storage.blob_store import BlobStore
+from app.core.tracing.tracer import traced
+from app.service.analytics_service import ProfileFacts, apply_analytics_delta
 
 
 def serialize_to_json(data):
@@ -18,70 +29,238 @@ def serialize_to_json(data):
     return data
 
 
-def save_to_database(parsed_data: ProfileCreate,
-                     file_name: str,
-                     file_url: str,
-                     db: Session,
-                     user_id: str
-                     ) -> Profile:
-    profile = Profile(
-        user_id=user_id,
-        first_name=parsed_data.first_name,
-        last_name=parsed_data.last_name,
-        headline=parsed_data.headline,
-        about=parsed_data.about,
-        location=parsed_data.location,
-        contact_info=parsed_data.contact_info.dict() if parsed_data.contact_info else None,  # Convierte a dict
-        skills=parsed_data.skills,
-        languages=[lang.dict() for lang in parsed_data.languages] if parsed_data.languages else None,
-        # Convierte cada lenguaje a dict
+def serialize_experience(exp: WorkExperience) -> dict:
+    return {
+        "company_name": exp.company_name,
+        "position": exp.position,
+        "location": exp.location,
+        "start_date": exp.start_date.isoformat() if exp.start_date else None,
+        "end_date": exp.end_date.isoformat() if exp.end_date else None,
+        "current": exp.current,
+        "description": exp.description,
+    }
+
+
+def serialize_education(edu: Education) -> dict:
+    return {
+        "institution_name": edu.institution_name,
+        "degree": edu.degree,
+        "field_of_study": edu.field_of_study,
+        "start_date": edu.start_date.isoformat() if edu.start_date else None,
+        "end_date": edu.end_date.isoformat() if edu.end_date else None,
+        "description": edu.description,
+    }
+
+
+PROFILE_CHANGED = "PROFILE_CHANGED"
+
+
+def build_profile_changed_event(profile: Profile) -> OutboxEvent:
+    """Crea el registro de outbox que notifica un cambio en el perfil."""
+    event_id = uuid.uuid4()
+    return OutboxEvent(
+        event_id=event_id,
+        event_type=PROFILE_CHANGED,
+        aggregate_id=profile.id,
+        event_key=profile.user_id,
+        payload={
+            "eventId": str(event_id),
+            "type": PROFILE_CHANGED,
+            "profileId": str(profile.id),
+            "userId": profile.user_id,
+            "occurredAt": datetime.utcnow().isoformat(),
+        },
     )
-    db.add(profile)
-    db.commit()
-    db.refresh(profile)
-
-    # Guardar experiencias laborales
-    if parsed_data.experiences:
-        for exp in parsed_data.experiences:
-            work_experience = WorkExperience(
-                profile_id=profile.id,
-                company_name=exp.company_name,
-                position=exp.position,
-                location=exp.location,
-                start_date=exp.start_date,
-                end_date=exp.end_date,
-                current=exp.current,
-                description=exp.description,
-            )
-            db.add(work_experience)
-
-    # Guardar educación
-    if parsed_data.education:
-        for edu in parsed_data.education:
-            education_entry = Education(
-                profile_id=profile.id,
-                institution_name=edu.institution_name,
-                degree=edu.degree,
-                field_of_study=edu.field_of_study,
-                start_date=edu.start_date,
-                end_date=edu.end_date,
-                description=edu.description,
-            )
-            db.add(education_entry)
-
-    db.commit()
-    # Serializar parsed_data
-    serialized_data = serialize_to_json(parsed_data.dict())
-
-    document = Document(
-        profile_id=profile.id,
-        type="CV",
-        file_name=file_name,
-        file_url=file_url,
-        mime_type="application/pdf",
-        parsed_data=serialized_data,
+
+
+@traced("db.get_profile")
+async def get_profile_by_user_id(db: AsyncSession, user_id: str) -> Optional[Profile]:
+    """Obtiene el perfil del usuario con sus experiencias, educación y documentos."""
+    result = await db.execute(
+        select(Profile)
+        .where(Profile.user_id == user_id)
+        .options(
+            selectinload(Profile.experiences),
+            selectinload(Profile.education),
+            selectinload(Profile.documents),
+        )
+    )
+    return result.scalars().first()
+
+
+@traced("db.get_document")
+async def get_document(db: AsyncSession, document_id: UUID) -> Optional[Document]:
+    """Obtiene un documento junto con su perfil."""
+    result = await db.execute(
+        select(Document)
+        .where(Document.id == document_id)
+        .options(selectinload(Document.profile))
+    )
+    return result.scalars().first()
+
+
+@traced("db.get_latest_cv_document")
+async def get_latest_cv_document(db: AsyncSession, user_id: str) -> Optional[Document]:
+    """Obtiene el último CV cargado por el usuario, si existe."""
+    result = await db.execute(
+        select(Document)
+        .join(Profile, Document.profile_id == Profile.id)
+        .where(Profile.user_id == user_id, Document.type == "CV")
+        .order_by(Document.uploaded_at.desc())
+        .limit(1)
     )
-    db.add(document)
-    db.commit()
+    return result.scalars().first()
+
+
+async def find_referenced_blobs(db: AsyncSession, blob_keys: List[str]) -> Set[str]:
+    """Subconjunto de las claves referenciadas por algún documento."""
+    result = await db.execute(select(Document.blob_key).where(Document.blob_key.in_(blob_keys)).distinct())
+    return set(result.scalars())
+
+
+async def sweep_orphan_blobs(db: AsyncSession, store: BlobStore, grace_seconds: float,
+                             batch_size: int = 1000) -> int:
+    """
+    Elimina los blobs que ningún documento referencia y que no se han escrito
+    durante el periodo de gracia. Las cargas en curso renuevan la fecha del
+    blob con `put`, así que no se borra uno que otra carga está por referenciar.
+    Retorna cuántos blobs se eliminaron.
+    """
+    cutoff = time.time() - grace_seconds
+    keys = await asyncio.to_thread(lambda: list(store.iter_keys(cutoff)))
+    removed = 0
+    for index in range(0, len(keys), batch_size):
+        batch = keys[index:index + batch_size]
+        referenced = await find_referenced_blobs(db, batch)
+        await db.rollback()
+        for key in batch:
+            if key not in referenced and await asyncio.to_thread(store.delete, key, cutoff):
+                removed += 1
+    await asyncio.to_thread(store.clean_tmp, cutoff)
+    return removed
+
+
+@traced("db.save_profile")
+async def save_to_database(parsed_data: ProfileCreate,
+                           file_name: str,
+                           file_url: str,
+                           db: AsyncSession,
+                           user_id: str,
+                           extracted_text: Optional[str] = None,
+                           blob_key: Optional[str] = None,
+                           size: Optional[int] = None
+                           ) -> Profile:
+    """
+    Crea o actualiza el perfil del usuario en una única transacción.
+    En una nueva carga se reemplazan las experiencias y la educación,
+    y se registra el documento junto con su texto extraído.
+    """
+    try:
+        return await _upsert_profile(parsed_data, file_name, file_url, db, user_id, extracted_text, blob_key, size)
+    except IntegrityError:
+        # Otra petición creó el perfil en paralelo: se reintenta como actualización
+        await db.rollback()
+        return await _upsert_profile(parsed_data, file_name, file_url, db, user_id, extracted_text, blob_key, size)
+
+
+async def _upsert_profile(parsed_data: ProfileCreate,
+                          file_name: str,
+                          file_url: str,
+                          db: AsyncSession,
+                          user_id: str,
+                          extracted_text: Optional[str],
+                          blob_key: Optional[str],
+                          size: Optional[int]
+                          ) -> Profile:
+    try:
+        result = await db.execute(
+            select(Profile)
+            .where(Profile.user_id == user_id)
+            .with_for_update()
+        )
+        profile = result.scalars().first()
+        if profile is None:
+            profile = Profile(user_id=user_id)
+            db.add(profile)
+            previous_facts = ProfileFacts()
+        else:
+            # Reemplaza las filas hijas del perfil existente, conservando su contribución a los agregados
+            removed = await db.execute(
+                delete(WorkExperience)
+                .where(WorkExperience.profile_id == profile.id)
+                .returning(WorkExperience.position, WorkExperience.current)
+            )
+            previous_facts = ProfileFacts.build(profile.skills, profile.languages, removed.all())
+            await db.execute(delete(Education).where(Education.profile_id == profile.id))
+
+        profile.first_name = parsed_data.first_name
+        profile.last_name = parsed_data.last_name
+        profile.headline = parsed_data.headline
+        profile.about = parsed_data.about
+        profile.location = parsed_data.location
+        profile.contact_info = parsed_data.contact_info.dict() if parsed_data.contact_info else None  # Convierte a dict
+        profile.skills = parsed_data.skills
+        # Convierte cada lenguaje a dict
+        profile.languages = [lang.dict() for lang in parsed_data.languages] if parsed_data.languages else None
+        # Explícito: si solo cambian experiencias o educación no habría UPDATE del perfil
+        # y las exportaciones incrementales por updated_at no verían el cambio
+        profile.updated_at = datetime.utcnow()
+        await db.flush()
+
+        # Guardar experiencias laborales
+        if parsed_data.experiences:
+            for exp in parsed_data.experiences:
+                work_experience = WorkExperience(
+                    profile_id=profile.id,
+                    company_name=exp.company_name,
+                    position=exp.position,
+                    location=exp.location,
+                    start_date=exp.start_date,
+                    end_date=exp.end_date,
+                    current=exp.current,
+                    description=exp.description,
+                )
+                db.add(work_experience)
+
+        # Guardar educación
+        if parsed_data.education:
+            for edu in parsed_data.education:
+                education_entry = Education(
+                    profile_id=profile.id,
+                    institution_name=edu.institution_name,
+                    degree=edu.degree,
+                    field_of_study=edu.field_of_study,
+                    start_date=edu.start_date,
+                    end_date=edu.end_date,
+                    description=edu.description,
+                )
+                db.add(education_entry)
+
+        # Serializar parsed_data
+        serialized_data = serialize_to_json(parsed_data.dict())
+
+        document = Document(
+            profile_id=profile.id,
+            type="CV",
+            file_name=file_name,
+            file_url=file_url,
+            blob_key=blob_key,
+            mime_type="application/pdf",
+            size=size,
+            extracted_text=extracted_text,
+            parsed_data=serialized_data,
+        )
+        db.add(document)
+
+        # Los agregados de analítica se actualizan con el delta respecto a la carga anterior
+        await apply_analytics_delta(db, previous_facts, ProfileFacts.from_profile_create(parsed_data))
+
+        # El evento se registra en la misma transacción; el relay lo publica en Kafka
+        db.add(build_profile_changed_event(profile))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
 
+    await db.refresh(profile)
     return profile
@@ -0,0 +1,61 @@
+# benchmarks/pdf_extraction.py
+"""
+Micro-benchmark de los motores de extracción de texto de PDF.
+
+Uso:
+    python -m benchmarks.pdf_extraction uploaded_files/*.pdf --repeat 20
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from app.agent.loader import EXTRACTORS, get_extractor
+
+
+def bench(name: str, file_path: str, repeat: int) -> dict:
+    extractor = get_extractor(name)
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extractor.extract(file_path)
+        timings.append(time.perf_counter() - start)
+
+    # Pico de memoria de una extracción adicional
+    tracemalloc.start()
+    extractor.extract(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "engine": name,
+        "pages": result.page_count,
+        "chars": len(result.text),
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("files", nargs="+")
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    arg_parser.add_argument("--engines", nargs="+", default=list(EXTRACTORS))
+    args = arg_parser.parse_args()
+
+    print(f"{'archivo':40} {'motor':12} {'págs':>5} {'chars':>8} {'mediana ms':>11} {'mín ms':>8} {'pico KiB':>9}")
+    for file_path in args.files:
+        for name in args.engines:
+            try:
+                row = bench(name, file_path, args.repeat)
+            except ImportError as e:
+                print(f"{file_path[-40:]:40} {name:12} omitido ({e})")
+                continue
+            print(f"{file_path[-40:]:40} {row['engine']:12} {row['pages']:>5} {row['chars']:>8} "
+                  f"{row['median_ms']:>11.2f} {row['min_ms']:>8.2f} {row['peak_kib']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from app.agent.extractor import (
+    AhoCorasick,
+    DATE_RANGE_RE,
+    EMAIL_RE,
+    UNKNOWN_PROFICIENCY,
+    _extract_languages,
+    extract_section,
+    find_phone,
+    find_skills,
+    pre_extract,
+)
+
+
+def test_email_re_matches_address():
+    assert EMAIL_RE.search("Correo: juan.perez+cv@correo.com.pe").group(0) == "juan.perez+cv@correo.com.pe"
+
+
+def test_find_phone_accepts_mobile_and_international_numbers():
+    assert find_phone("Celular: 987 654 321").group(0) == "987 654 321"
+    assert find_phone("Teléfono +51 962933641").group(0) == "+51 962933641"
+
+
+def test_find_phone_rejects_date_ranges_and_short_numbers():
+    assert find_phone("Lima 2019 - 2021") is None
+    assert find_phone("01/2019 - 12/2021") is None
+    assert find_phone("Código 12345678") is None
+
+
+def test_date_range_re_matches_spanish_and_english_ranges():
+    match = DATE_RANGE_RE.search("Desarrollador (marzo de 2019 - actualidad)")
+    assert match.group("start") == "marzo de 2019"
+    assert match.group("end") == "actualidad"
+    assert DATE_RANGE_RE.search("Jan 2018 to Dec 2020").group("end") == "Dec 2020"
+
+
+def test_aho_corasick_prefers_longest_whole_word_matches():
+    matcher = AhoCorasick({"spring": "Spring", "spring boot": "Spring Boot", "java": "Java"})
+    assert matcher.find("Spring Boot, javascript y Java") == [(0, 11, "Spring Boot"), (26, 30, "Java")]
+
+
+def test_find_skills_requires_exact_case_for_ambiguous_words():
+    skills = [value for _, _, value in find_skills("I go to rest and excel at Python, Go and REST")]
+    assert skills == ["Python", "Go", "REST"]
+
+
+def test_languages_pair_with_following_proficiency():
+    languages, _ = _extract_languages("Inglés avanzado, Español nativo\nInglés (B2), Portugués (básico)")
+    assert {lang.language: lang.proficiency for lang in languages} == {
+        "Inglés": "Avanzado", "Español": "Nativo", "Portugués": "Básico",
+    }
+
+
+def test_languages_without_level_are_unspecified():
+    languages, _ = _extract_languages("Inglés, Francés avanzado")
+    assert {lang.language: lang.proficiency for lang in languages} == {
+        "Inglés": UNKNOWN_PROFICIENCY, "Francés": "Avanzado",
+    }
+
+
+def test_contact_section_with_unexplained_text_needs_model():
+    assert extract_section("contact", "Juan Perez\njuan@x.com\nLima 2019 - 2021") is None
+
+
+def test_contact_section_resolved_deterministically():
+    contact = extract_section("contact", "JUAN PEREZ\nEmail: juan@x.com\nCelular: +51 987 654 321")
+    assert (contact.first_name, contact.last_name) == ("Juan", "Perez")
+    assert contact.contact_info.email == "juan@x.com"
+    assert contact.contact_info.phone == "+51 987 654 321"
+
+
+def test_pre_extract_ignores_contact_data_outside_preamble():
+    cv = "Juan Perez\nDesarrollador\n\nEXPERIENCIA\nAcme 2019 - 2021\n\nREFERENCIAS\nana@acme.com 987 654 321"
+    pre = pre_extract(cv)
+    assert pre.email is None
+    assert pre.phone is None
+    assert pre.contact_info is None
+
+
+def test_languages_mentioned_outside_their_section_need_model():
+    cv = ("Juan Perez\njuan@x.com\n\nEDUCACIÓN\nColegio Alemán de Lima 2005 - 2015\n\n"
+          "IDIOMAS\nInglés: nivel conversacional")
+    assert extract_section("languages", cv) is None
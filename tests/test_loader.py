@@ -0,0 +1,36 @@
+from app.agent.loader import PdfTextExtractor
+
+
+class StubExtractor(PdfTextExtractor):
+    def __init__(self, pages, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = pages
+
+    def iter_pages(self, file_path):
+        self.total_pages = len(self.pages)
+        yield from self.pages[:self.max_pages]
+
+
+def test_extract_never_exceeds_max_chars():
+    result = StubExtractor(["a" * 10, "b" * 1000], max_chars=10).extract("cv.pdf")
+    assert result.text == "a" * 10
+    assert result.page_count == 1
+    assert result.truncated
+
+    result = StubExtractor(["a" * 4, "b" * 1000], max_chars=10).extract("cv.pdf")
+    assert result.text == "a" * 4 + "\n" + "b" * 5
+    assert len(result.text) == 10
+    assert result.truncated
+
+
+def test_extract_within_limits_is_not_truncated():
+    result = StubExtractor(["a" * 4, "b" * 5], max_chars=10).extract("cv.pdf")
+    assert result.text == "aaaa\nbbbbb"
+    assert result.page_count == 2
+    assert not result.truncated
+
+
+def test_extract_flags_pages_dropped_by_max_pages():
+    result = StubExtractor(["a", "b", "c"], max_pages=2).extract("cv.pdf")
+    assert result.text == "a\nb"
+    assert result.truncated
@@ -0,0 +1,40 @@
+from app.agent.sections import split_sections, MAX_CONTACT_CHARS
+
+CV = """Juan Perez
+juan.perez@correo.com
+
+EXPERIENCIA
+EXPERIENCE
+Desarrollador en Acme 2019 - 2021
+
+EDUCACIÓN
+Universidad Nacional de Ingeniería 2015
+
+IDIOMAS
+Inglés avanzado
+"""
+
+
+def test_split_sections_assigns_preamble_to_contact():
+    sections = split_sections(CV)
+    assert list(sections) == ["contact", "experience", "education", "languages"]
+    assert sections["contact"] == "Juan Perez\njuan.perez@correo.com"
+    assert sections["experience"] == "Desarrollador en Acme 2019 - 2021"
+
+
+def test_split_sections_rejects_adjacent_headings_of_different_sections():
+    text = "Juan Perez\nEDUCACION\nEDUCATION\nHABILIDADES TÉCNICAS:\nPython\nEXPERIENCIA\nAcme"
+    assert split_sections(text) == {}
+
+
+def test_split_sections_rejects_empty_section_with_heading():
+    assert split_sections("Juan Perez\nEXPERIENCIA\nAcme\nIDIOMAS\n") == {}
+
+
+def test_split_sections_rejects_oversized_contact_preamble():
+    preamble = "palabra " * (MAX_CONTACT_CHARS // 4)
+    assert split_sections(f"{preamble}\nEXPERIENCIA\nAcme\nEDUCACIÓN\nUNI") == {}
+
+
+def test_split_sections_requires_two_headings():
+    assert split_sections("Juan Perez\nEXPERIENCIA\nAcme") == {}